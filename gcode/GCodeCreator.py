@@ -1,11 +1,57 @@
+import io
+import re
+from collections import Counter
 import numpy as np
-from numpy.typing import NDArray
-from typing import Any, List
+from typing import Iterable, List
 # Create gcode from numpy array of points
 from dataclasses import dataclass
 from meshing import Mask
 from simulation import Movement
 
+# Per-movement line templates, formatted through the C-level %-operator (feeds are integer mm/min)
+_DEPOSITION_MOVE_FMT = "G1 X%.2f Y%.2f F%d ; Deposition move"
+_APPROACH_MOVE_FMT = "G1 X%.2f Y%.2f F%d ; Approach to start without spray"
+
+def _format_deposition_moves(x: List[float], y: List[float], feeds: List[int]) -> str:
+    """Format a run of deposition moves as one newline-joined block."""
+    fmt = _DEPOSITION_MOVE_FMT
+    return "\n".join([fmt % t for t in zip(x, y, feeds)])
+
+
+# Line parsers for estimate_print_time; lookaheads pick up each parameter regardless of order
+def _param(letter: str) -> str:
+    return rf"(?=(?:[^;\n]*?[ \t]{letter}([^\s;]+))?)"
+
+
+_G1_RE = re.compile(r"^[ \t]*G1(?![0-9])" + "".join(_param(c) for c in "XYZF"), re.M)
+_G4_RE = re.compile(r"^[ \t]*G4" + _param("P") + _param("S"), re.M)
+_TIMED_CMD_RE = re.compile(r"^[ \t]*(M190|M109|PAUSE|M0)", re.M)
+# Fixed time estimates (seconds) per command: (bucket, seconds)
+_TIMED_CMD_COSTS = {
+    "M190": ("heating", 180.0),  # Bed heating, ~3 minutes
+    "M109": ("heating", 120.0),  # Nozzle heating, ~2 minutes
+    "PAUSE": ("pause", 5.0),     # User interaction
+    "M0": ("pause", 5.0),
+}
+
+# Static G-code blocks shared by every generation; only Z/park values are formatted per call
+_HEADER_STATIC = (
+    "; Start of G-code",
+    "G28 ; Home all axes",
+    "G21 ; Set units to millimeters",
+    "G90 ; Use absolute coordinates",
+    "G1 F3000 ; Set default feed rate",
+)
+_HEADER_STATIC_TAIL = (
+    "G1 X0.1 Y0.1 F3000 ; Move to (0,0)",
+    "PAUSE; Wait for user confirmation to start",
+)
+_FOOTER_STATIC_TAIL = (
+    "M140 S0 ; Turn off bed heater",
+    "M104 S0 ; Turn off nozzle heater",
+    "M30 ; End of program",
+)
+
 
 @dataclass
 class MaskMovement:
@@ -18,7 +64,8 @@ class GCodeCreator:
         from wrapper.MaldiStatus import SampleAggregator
 
         self.data: List[SampleAggregator] = data
-        self.gcode_buffer: List[str] = []
+        self.gcode_buffer: io.StringIO = io.StringIO()
+        self._last_gcode: str = ""
         self.z_height: float = z_height
         self.safe_z_offset: float = safe_z_offset
         self.park_x: float = park_x
@@ -28,70 +75,88 @@ class GCodeCreator:
         self.max_speed: float = max_speed  # Max travel speed (non-deposition)
         
     def generate_gcode(self) -> str:
+        # Start from an empty buffer so repeated calls don't accumulate copies
+        self.gcode_buffer = io.StringIO()
+        # Bind frequently used attributes to locals
+        data = self.data
+        emit = self._emit
+        emit_lines = self._emit_lines
+        bed_temp = self.bed_temp
+        nozzle_temp = self.nozzle_temp
         # Header: Initial setup commands
         # Samples, serpentines info
-        for s_agg in self.data:
-            self.gcode_buffer.append("; Sample at ({} , {})".format(s_agg.bl_corner[0], s_agg.bl_corner[1]))
-            self.gcode_buffer.append(";  - Size: {} x {}".format(s_agg.x_size, s_agg.y_size))
-            self.gcode_buffer.append(";  - Stride: {}".format(s_agg.serpentine.get_stride()))
-        self.gcode_buffer.append("; Start of G-code")
-        self.gcode_buffer.append("G28 ; Home all axes")
-        self.gcode_buffer.append("G21 ; Set units to millimeters")
-        self.gcode_buffer.append("G90 ; Use absolute coordinates")
-        self.gcode_buffer.append("G1 F3000 ; Set default feed rate")
-        # self.gcode_buffer.append("M107 ; Ensure spray/fan is off")  # Commented out since spray is manual
+        strides = [s_agg.serpentine.get_stride() for s_agg in data]
+        emit_lines(
+            f"; Sample at ({s_agg.bl_corner[0]} , {s_agg.bl_corner[1]})\n"
+            f";  - Size: {s_agg.x_size} x {s_agg.y_size}\n"
+            f";  - Stride: {stride}"
+            for s_agg, stride in zip(data, strides)
+        )
+        emit_lines(_HEADER_STATIC)
+        # emit("M107 ; Ensure spray/fan is off")  # Commented out since spray is manual
         # Move to WORKING Z (will not change during the deposition)
-        self.gcode_buffer.append("G1 Z{:.2f} F3000 ; Move to working height".format(self.z_height))
+        emit("G1 Z{:.2f} F3000 ; Move to working height".format(self.z_height))
         # Move to 0,0 and wait
-        self.gcode_buffer.append("G1 X0.1 Y0.1 F3000 ; Move to (0,0)")
-        self.gcode_buffer.append("PAUSE; Wait for user confirmation to start")
+        emit_lines(_HEADER_STATIC_TAIL)
         # Set temperatures if specified
-        if self.bed_temp > 0:
-            self.gcode_buffer.append(f"M140 S{self.bed_temp} ; Set bed temperature")
-            self.gcode_buffer.append(f"M190 S{self.bed_temp} ; Wait for bed temperature to reach target")
-        if self.nozzle_temp > 0:
-            self.gcode_buffer.append(f"M104 S{self.nozzle_temp} ; Set nozzle temperature")
-            self.gcode_buffer.append(f"M109 S{self.nozzle_temp} ; Wait for nozzle temperature to reach target")
-        first_serpentine = True
-        for data_entry in self.data:
-            first_movement = True
-            cur_mask = data_entry.sample_mask
-            movs = data_entry.serpentine.movements
-            self.gcode_buffer.append("; Deposition for Mask")
-            for mov in movs:
-                cur_x = mov.x
-                cur_y = mov.y
-                speed = mov.speed
-                if first_movement:
-                    # First movement, move without spraying
-                    speed = self.max_speed  # max speed to starting pointMALDI_S
-                    self.gcode_buffer.append("G1 X{:.2f} Y{:.2f} F{} ; Approach to start without spray".format(cur_x, cur_y, self.max_speed * 60))
-                    #self.gcode_buffer.append("M106 S255 ; Turn on spray/fan at full speed")
-                    first_movement = False
-                else:
-                    self.gcode_buffer.append("G1 X{:.2f} Y{:.2f} F{} ; Deposition move".format(cur_x, cur_y, speed * 60))
+        if bed_temp > 0:
+            emit_lines((
+                f"M140 S{bed_temp} ; Set bed temperature",
+                f"M190 S{bed_temp} ; Wait for bed temperature to reach target",
+            ))
+        if nozzle_temp > 0:
+            emit_lines((
+                f"M104 S{nozzle_temp} ; Set nozzle temperature",
+                f"M109 S{nozzle_temp} ; Wait for nozzle temperature to reach target",
+            ))
+        # Approach feed is identical for every serpentine; compute it once
+        approach_feed = round(self.max_speed * 60)
+        for data_entry in data:
+            x, y, speed = data_entry.serpentine.as_arrays()
+            emit("; Deposition for Mask")
+            if x.size == 0:
+                continue
+            xs = x.tolist()
+            ys = y.tolist()
+            feeds = np.rint(speed * 60).astype(np.int64).tolist()
+            # First movement, move without spraying at max speed to starting point
+            emit(_APPROACH_MOVE_FMT % (xs[0], ys[0], approach_feed))
+            #emit("M106 S255 ; Turn on spray/fan at full speed")
+            if len(xs) > 1:
+                emit(_format_deposition_moves(xs[1:], ys[1:], feeds[1:]))
 
             # After each mask, turn off spray briefly if needed, but keep on for continuity
             # For now, leave on; add logic if masks are separate
 
         # Footer: Cleanup
         self._add_footer()
-        self.gcode_buffer.append("; End of G-code")
-        return "\n".join(self.gcode_buffer)
+        emit("; End of G-code")
+        self._last_gcode = self.gcode_buffer.getvalue()
+        return self._last_gcode
+
+    def _emit(self, line: str) -> None:
+        """Write a single G-code line to the buffer."""
+        self.gcode_buffer.write(line)
+        self.gcode_buffer.write("\n")
+
+    def _emit_lines(self, lines: Iterable[str]) -> None:
+        """Write a sequence of G-code lines to the buffer."""
+        write = self.gcode_buffer.write
+        for line in lines:
+            write(line)
+            write("\n")
 
     def _add_footer(self):
         """Add footer commands for safe shutdown."""
-        self.gcode_buffer.append("; Footer: Safe shutdown")
+        self._emit("; Footer: Safe shutdown")
         # Raise head to safe height
         safe_z = self.z_height + self.safe_z_offset
-        self.gcode_buffer.append("G1 Z{:.2f} F3000 ; Raise to safe height".format(safe_z))
+        self._emit("G1 Z{:.2f} F3000 ; Raise to safe height".format(safe_z))
         # Park head
-        self.gcode_buffer.append("G1 X{:.2f} Y{:.2f} F3000 ; Park at safe position".format(self.park_x, self.park_y))
-        self.gcode_buffer.append("M140 S0 ; Turn off bed heater")
-        self.gcode_buffer.append("M104 S0 ; Turn off nozzle heater")
-        # self.gcode_buffer.append("M107 ; Turn off spray/fan")  # Commented out since spray is manual
-        # End program
-        self.gcode_buffer.append("M30 ; End of program")
+        self._emit("G1 X{:.2f} Y{:.2f} F3000 ; Park at safe position".format(self.park_x, self.park_y))
+        # self._emit("M107 ; Turn off spray/fan")  # Commented out since spray is manual
+        # Heaters off and end program
+        self._emit_lines(_FOOTER_STATIC_TAIL)
 
     def estimate_print_time(self, gcode: str | None = None) -> dict:
         """
@@ -104,81 +169,44 @@ class GCodeCreator:
             Dictionary with time breakdown: total, movement, heating, pauses
         """
         if gcode is None:
-            gcode = "\n".join(self.gcode_buffer)
-        
-        lines = gcode.split('\n')
-        
-        current_x = 0.0
-        current_y = 0.0
-        current_z = 0.0
-        current_feed = 3000.0  # Default feed rate (mm/min)
-        
-        movement_time = 0.0  # Time spent in actual movements
-        heating_time = 0.0   # Time spent heating (estimated)
-        pause_time = 0.0     # Time spent in pauses
-        
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith(';'):
-                continue
-            
-            # Remove inline comments
-            if ';' in line:
-                line = line.split(';')[0].strip()
-            
-            # Parse G1 movements
-            if line.startswith('G1'):
-                parts = line.split()
-                new_x = current_x
-                new_y = current_y
-                new_z = current_z
-                feed = current_feed
-                
-                for part in parts[1:]:
-                    if part.startswith('X'):
-                        new_x = float(part[1:])
-                    elif part.startswith('Y'):
-                        new_y = float(part[1:])
-                    elif part.startswith('Z'):
-                        new_z = float(part[1:])
-                    elif part.startswith('F'):
-                        feed = float(part[1:])
-                        current_feed = feed
-                
-                # Calculate distance
-                distance = np.sqrt((new_x - current_x)**2 + 
-                                 (new_y - current_y)**2 + 
-                                 (new_z - current_z)**2)
-                
-                # Calculate time (feed is in mm/min)
-                if feed > 0:
-                    time_sec = (distance / feed) * 60.0
-                    movement_time += time_sec
-                
-                current_x = new_x
-                current_y = new_y
-                current_z = new_z
-            
-            # Parse heating commands (estimate)
-            elif line.startswith('M190') or line.startswith('M109'):
-                # Heating time estimates (very rough)
-                if 'M190' in line:  # Bed heating
-                    heating_time += 180.0  # ~3 minutes estimate
-                elif 'M109' in line:  # Nozzle heating
-                    heating_time += 120.0  # ~2 minutes estimate
-            
-            # Parse pause/dwell commands
-            elif line.startswith('PAUSE') or line.startswith('M0'):
-                pause_time += 5.0  # Assume 5 seconds for user interaction
-            elif line.startswith('G4'):
-                # G4 P<milliseconds> or S<seconds>
-                parts = line.split()
-                for part in parts[1:]:
-                    if part.startswith('P'):
-                        pause_time += float(part[1:]) / 1000.0
-                    elif part.startswith('S'):
-                        pause_time += float(part[1:])
-        
+            gcode = self._last_gcode
+
+        # G1 moves: one row per line with NaN for missing parameters, prefixed by the
+        # initial state (origin, default feed 3000 mm/min) and forward-filled
+        moves = _G1_RE.findall(gcode)
+        if moves:
+            # Object dtype: a fixed-width str array as narrow as the captures would truncate "nan"
+            cols = np.array(moves, dtype=object)
+            cols[cols == ""] = "nan"
+            params = np.vstack(([0.0, 0.0, 0.0, 3000.0], cols.astype(float)))
+            missing = np.isnan(params)
+            rows = np.where(missing, 0, np.arange(params.shape[0])[:, None])
+            np.maximum.accumulate(rows, axis=0, out=rows)
+            params = np.take_along_axis(params, rows, axis=0)
+            dx, dy, dz = np.diff(params[:, :3], axis=0).T
+            distance = np.hypot(np.hypot(dx, dy), dz)
+            feed = params[1:, 3]
+            # Time per move (feed is in mm/min)
+            valid = feed > 0
+            movement_time = float(np.sum(distance[valid] / feed[valid]) * 60.0)
+        else:
+            movement_time = 0.0
+
+        # Heating and pause estimates (very rough), dispatched from a single scan
+        fixed = {"heating": 0.0, "pause": 0.0}
+        for cmd, count in Counter(_TIMED_CMD_RE.findall(gcode)).items():
+            bucket, seconds = _TIMED_CMD_COSTS[cmd]
+            fixed[bucket] += seconds * count
+        heating_time = fixed["heating"]
+        pause_time = fixed["pause"]
+
+        # Dwell: G4 P<milliseconds> or S<seconds>
+        for p_ms, s_sec in _G4_RE.findall(gcode):
+            if p_ms:
+                pause_time += float(p_ms) / 1000.0
+            if s_sec:
+                pause_time += float(s_sec)
+
         total_time = movement_time + heating_time + pause_time
         
         return {
@@ -193,9 +221,8 @@ class GCodeCreator:
     
     def _format_time(self, seconds: float) -> str:
         """Format time in seconds to human-readable string."""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
+        hours, rem = divmod(int(seconds), 3600)
+        minutes, secs = divmod(rem, 60)
         
         if hours > 0:
             return f"{hours}h {minutes}m {secs}s"
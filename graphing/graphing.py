@@ -10,9 +10,16 @@ from numpy import ndarray as NDArray
 def plot_x_y_points(points: NDArray, show: bool = False):
     x = points[0, :]
     y = points[1, :]
-    plt.quiver(x[:-1], y[:-1], x[1:] - x[:-1], y[1:] - y[:-1], angles='xy', scale_units='xy', scale=1)
-    plt.xlim(x.min() - 1, x.max() + 1)
-    plt.ylim(y.min() - 1, y.max() + 1)
-    plt.grid()
+    fig, ax = plt.subplots()
+    ax.quiver(x[:-1], y[:-1], np.diff(x), np.diff(y), angles='xy', scale_units='xy', scale=1)
+    # Bounds for both axes in one reduction each over the (2, N) array
+    (x_min, y_min), (x_max, y_max) = points.min(axis=1), points.max(axis=1)
+    ax.set_xlim(x_min - 1, x_max + 1)
+    ax.set_ylim(y_min - 1, y_max + 1)
+    ax.grid()
     if show:
         plt.show()
+    else:
+        # Release the pyplot reference so repeated calls don't accumulate figures
+        plt.close(fig)
+    return fig
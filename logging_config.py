@@ -24,17 +24,33 @@ class ColoredFormatter(logging.Formatter):
     }
     RESET = '\033[0m'
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Windows doesn't support ANSI colors by default, and pipes/files shouldn't get escape codes
+        self._use_color = sys.platform != 'win32' and sys.stdout.isatty()
+    
     def format(self, record):
-        if sys.platform == 'win32':
-            # Windows doesn't support ANSI colors by default
-            log_color = ''
-            reset = ''
-        else:
-            log_color = self.COLORS.get(record.levelname, '')
-            reset = self.RESET
+        if not self._use_color:
+            return super().format(record)
         
-        record.msg = f"{log_color}{record.msg}{reset}"
-        return super().format(record)
+        # Color only this handler's output; restore the message so other handlers see it unchanged
+        msg = record.msg
+        record.msg = f"{self.COLORS.get(record.levelname, '')}{msg}{self.RESET}"
+        try:
+            return super().format(record)
+        finally:
+            record.msg = msg
+
+
+class LazyFileHandler(logging.FileHandler):
+    """File handler that creates its log directory and file on the first emitted record."""
+    
+    def __init__(self, filename, mode='a', encoding=None):
+        super().__init__(filename, mode=mode, encoding=encoding, delay=True)
+    
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
 
 
 def setup_logging(name: str = "MALDI", level: int = logging.INFO) -> logging.Logger:
@@ -64,14 +80,13 @@ def setup_logging(name: str = "MALDI", level: int = logging.INFO) -> logging.Log
         console_handler.setFormatter(console_formatter)
         logger.addHandler(console_handler)
         
-        # File handler (optional - for persistent logging)
+        # File handler (optional - for persistent logging), opened on first record
         logs_dir = Path(__file__).parent / "logs"
-        logs_dir.mkdir(exist_ok=True)
         
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         log_file = logs_dir / f"maldi_{timestamp}.log"
         
-        file_handler = logging.FileHandler(log_file)
+        file_handler = LazyFileHandler(log_file)
         file_handler.setLevel(logging.DEBUG)
         file_formatter = logging.Formatter(
             fmt='[%(asctime)s] %(levelname)s - %(name)s: %(message)s',
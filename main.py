@@ -10,7 +10,6 @@ import streamlit as st
 import numpy as np
 import time
 from wrapper.MaldiStatus import MaldiStatus, Config
-import cProfile
 
 def test_all_methods():
     """Test all methods of MaldiStatus class."""
@@ -21,16 +20,18 @@ def test_all_methods():
     print("✓ MaldiStatus instance created")
     
     # Set some config
-    Config().set("grid_step", 0.5)
-    Config().set("bed_size_mm", 200.0)
-    Config().set("minimum_stride", 1.0)
-    Config().set("maximum_stride", 5.0)
-    Config().set("stride_steps", 5)
-    Config().set("speed", 5.0)
-    Config().set("passes", 2)
-    Config().set("z_height", 0.5)
-    Config().set("bed_temperature", 60.0)
-    Config().set("nozzle_temperature", 200.0)
+    Config().update({
+        "grid_step": 0.5,
+        "bed_size_mm": 200.0,
+        "minimum_stride": 1.0,
+        "maximum_stride": 5.0,
+        "stride_steps": 5,
+        "speed": 5.0,
+        "passes": 2,
+        "z_height": 0.5,
+        "bed_temperature": 60.0,
+        "nozzle_temperature": 200.0,
+    })
     print("✓ Config set")
     
     # Refresh bed mesh
@@ -99,21 +100,26 @@ def main():
     for info in samples_info:
         print(info)
     
-    # Profiling optimize_strides
+    # Profiling optimize_strides (opt-in, cProfile slows pure-Python code noticeably)
+    if not os.environ.get("MALDI_PROFILE"):
+        ms.optimize_strides()
+        return
+    import cProfile
+    from pstats import Stats
     profiler = cProfile.Profile()
     profiler.enable()
     ms.optimize_strides()
     profiler.disable()
     # save profiling results to a file
     with open("optimize_strides_profile.txt", "w") as f:
-        from pstats import Stats
         stats = Stats(profiler, stream=f)
-        stats.sort_stats("cumtime")
-        stats.print_stats()
+        stats.strip_dirs()
+        stats.sort_stats("tottime")
+        stats.print_stats(40)
         
 if __name__ == "__main__":
     #test_all_methods()
-    # main()  # Uncomment to run the original main with profiling
+    # main()  # Uncomment to run the original main (set MALDI_PROFILE=1 to profile)
     import streamlit.web.bootstrap
     script_path = os.path.abspath("webapp/entry.py")
     streamlit.web.bootstrap.run(script_path, False, [], {})
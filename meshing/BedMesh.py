@@ -3,37 +3,69 @@ from numpy import ndarray as NDArray
 from numpy.typing import ArrayLike
 from typing import Optional, Callable, Tuple, List
 import scipy.interpolate as interp
-from functools import singledispatch
-from .utils import boolean_function
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
 from scipy.ndimage import label as ndimage_label, find_objects
 from wrapper.Config import Config
 
+try:
+    # Optional: faster connected-component labelling than scipy.ndimage.label
+    import cc3d
+except ImportError:
+    cc3d = None
+
+def _bilinear_sample(mesh: NDArray, u: NDArray, v: NDArray, origin: float, step: float) -> NDArray:
+    """
+    Bilinear sample of `mesh` on a uniform grid, with (u, v) along axes (0, 1).
+
+    Matches RegularGridInterpolator(method="linear", bounds_error=False): points
+    outside the grid return NaN.
+    """
+    n0, n1 = mesh.shape
+    fu = (u - origin) / step
+    fv = (v - origin) / step
+    outside = (fu < 0) | (fu > n0 - 1) | (fv < 0) | (fv > n1 - 1)
+    # Lower corner index, kept one cell inside so the upper corner is always valid
+    i = np.clip(np.floor(fu), 0, n0 - 2).astype(np.intp)
+    j = np.clip(np.floor(fv), 0, n1 - 2).astype(np.intp)
+    wu = fu - i
+    wv = fv - j
+    top = mesh[i, j] * (1.0 - wv) + mesh[i, j + 1] * wv
+    bottom = mesh[i + 1, j] * (1.0 - wv) + mesh[i + 1, j + 1] * wv
+    result = top * (1.0 - wu) + bottom * wu
+    return np.where(outside, np.nan, result)
+
+
 class BedMesh:
-    def __init__(self, size_mm: float, grid_step_mm: float, spray_function: Optional[Callable] = None):
+    def __init__(self, size_mm: float, grid_step_mm: float, spray_function: Optional[Callable] = None,
+                 spray_mask: Optional["SprayMask"] = None, dtype: np.dtype = np.float32):
         """
         Initialize the BedMesh object.
 
         Args:
             size_mm (float): The size of the mesh in millimeters.
             grid_step_mm (float): The step size of the grid in millimeters.
+            spray_function (Optional[Callable]): Kernel generator for the nozzle.
+            spray_mask (Optional[SprayMask]): Prebuilt nozzle kernel to share instead of building one.
+            dtype (np.dtype): Deposition mesh dtype; float64 keeps tiny increments on very long runs.
         """
 
         steps_count = int(round(size_mm / grid_step_mm)) + 1
         self.steps_count = steps_count
         self._x_space = np.linspace(0, size_mm, steps_count)
         self._y_space = np.linspace(0, size_mm, steps_count)
-        temp_mesh: NDArray = np.zeros((steps_count, steps_count), dtype=float)
+        # float32 is ample for deposition intensities and halves memory traffic in the spray path
+        temp_mesh: NDArray = np.zeros((steps_count, steps_count), dtype=dtype)
         self.deposition_mesh: NDArray = temp_mesh
         self.bool_mesh = np.zeros_like(temp_mesh, dtype=bool)
         self.size_mm = size_mm
         self.grid_step_mm = grid_step_mm
         self._bool_masks = []
         self.spray_function = spray_function
+        # Interpolators over deposition_mesh keyed by method; dropped whenever the mesh changes
+        self._interp_cache: dict = {}
+        # (labeled, num_features, slices) for bool_mesh; dropped whenever a sample mask is added
+        self._label_cache: Optional[Tuple[NDArray, int, Optional[list]]] = None
         self.z_height = Config().get_height()
-        self.init_nozzle()
+        self.init_nozzle(spray_mask=spray_mask)
     
     @property
     def spray_size_mm(self) -> float:
@@ -42,23 +74,43 @@ class BedMesh:
         size = conf._get_diameter_for_z(self.z_height)
         return size
     
-    def get_point(self, x: float, y: float, method: str = "cubic"):
+    def get_point(self, x: float | ArrayLike, y: float | ArrayLike, method: str = "cubic"):
         """
-        Get the value at a specific point in the mesh.
+        Get the value at a specific point (or points) in the mesh.
 
         Args:
-            x (float): The x-coordinate of the point.
-            y (float): The y-coordinate of the point.
+            x (float | ArrayLike): The x-coordinate(s) of the point(s).
+            y (float | ArrayLike): The y-coordinate(s) of the point(s).
             method (str): The interpolation method to use (default is "cubic").
 
         Returns:
-            Optional[float]: The interpolated value at the specified point, or None if out of bounds.
+            NDArray: The interpolated value(s), NaN where out of bounds.
         """
-        interpolator = interp.RegularGridInterpolator(
-            (self._x_space, self._y_space), self.deposition_mesh, bounds_error=False, method=method
-        )
-        result = interpolator([x, y])
-        return result
+        if method == "linear" and self.steps_count > 1:
+            # Uniform grid: direct 4-tap sample instead of the generic interpolator
+            xs, ys = np.broadcast_arrays(np.atleast_1d(np.asarray(x, dtype=float)), np.asarray(y, dtype=float))
+            return _bilinear_sample(self.deposition_mesh, xs, ys, float(self._x_space[0]),
+                                    float(self._x_space[1] - self._x_space[0]))
+        interpolator = self._interp_cache.get(method)
+        if interpolator is None:
+            interpolator = interp.RegularGridInterpolator(
+                (self._x_space, self._y_space), self.deposition_mesh, bounds_error=False, method=method
+            )
+            self._interp_cache[method] = interpolator
+        if np.ndim(x) == 0 and np.ndim(y) == 0:
+            return interpolator([x, y])
+        # Evaluate all points in a single call
+        xs, ys = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        return interpolator(np.stack((xs, ys), axis=-1))
+
+    def _invalidate(self) -> None:
+        """Drop cached views of the deposition mesh after it has been modified."""
+        if self._interp_cache:
+            self._interp_cache.clear()
+
+    def _invalidate_labels(self) -> None:
+        """Drop the cached sample labelling after bool_mesh has been modified."""
+        self._label_cache = None
 
     def add_bool_mask(self, points: List[float], shape: str = "rectangle"):
         """
@@ -71,35 +123,117 @@ class BedMesh:
         Raises:
             ValueError: If the shape is not recognized or the points are invalid.
         """
-        from .Mask import SampleMask
         if shape == "rectangle":
             if points is None or len(points) != 4:
                 raise ValueError("points must be [x_min, x_max, y_min, y_max]")
-            sample = np.asarray(points, dtype=float)
-            corner1 = (float(sample[0]), float(sample[2]))
-            x_size = float(sample[1] - sample[0])
-            y_size = float(sample[3] - sample[2])
+            return self.add_bool_masks([points])[0]
+        else:
+            raise ValueError(f"Unknown shape: {shape}")  # TODO More shapes
+
+    def add_bool_masks(self, rectangles: ArrayLike) -> List["SampleMask"]:
+        """
+        Add several rectangular boolean masks to the bed mesh at once.
+
+        Args:
+            rectangles (ArrayLike): Rows of [x_min, x_max, y_min, y_max].
+
+        Returns:
+            List[SampleMask]: One mask per rectangle, in input order.
+
+        Raises:
+            ValueError: If the rectangles are not given as rows of four values.
+        """
+        from .Mask import SampleMask
+        samples = np.asarray(rectangles, dtype=float)
+        if samples.ndim != 2 or samples.shape[1] != 4:
+            raise ValueError("rectangles must be rows of [x_min, x_max, y_min, y_max]")
+        corners = samples[:, [0, 2]]
+        sizes = samples[:, [1, 3]] - corners
+        # Index bounds for every rectangle, matching SampleMask's >= / < boundary rule
+        far = corners + sizes
+        x_lo, x_hi = np.searchsorted(self._x_space, (corners[:, 0], far[:, 0]), side="left")
+        y_lo, y_hi = np.searchsorted(self._y_space, (corners[:, 1], far[:, 1]), side="left")
+        masks = []
+        for corner, size, x0, x1, y0, y1 in zip(corners.tolist(), sizes.tolist(), x_lo.tolist(), x_hi.tolist(),
+                                                y_lo.tolist(), y_hi.tolist()):
+            self.bool_mesh[y0:y1, x0:x1] = True
+            # Rectangle masks keep only their geometry; the raster is built on demand
             mask = SampleMask(
                 size_mm=self.size_mm,
                 grid_step_mm=self.grid_step_mm,
-                bl_corner=corner1,
-                x_size=x_size,
-                y_size=y_size,
+                bl_corner=corner,
+                x_size=size[0],
+                y_size=size[1],
             )
-            mask.apply(self, apply_position=(0, 0), mask_anchor=(0, 0))
             self._bool_masks.append(mask)
-            return mask
-        else:
-            raise ValueError(f"Unknown shape: {shape}")  # TODO More shapes
+            masks.append(mask)
+        self._invalidate_labels()
+        return masks
+
+    def share_samples(self, source: "BedMesh") -> None:
+        """
+        Use the sample masks, boolean mesh and labelling of another bed of the same grid.
+
+        The arrays are shared by reference, not copied, so neither bed may add masks afterwards.
+        Meant for worker beds that differ from `source` only in their deposition.
 
-    def init_nozzle(self):
+        Raises:
+            ValueError: If the two beds do not have the same grid.
+        """
+        if source.bool_mesh.shape != self.bool_mesh.shape or source.grid_step_mm != self.grid_step_mm:
+            raise ValueError("share_samples requires beds with the same grid")
+        # Label once on the source so every sharing bed reuses the same label image
+        source._get_labels()
+        self.bool_mesh = source.bool_mesh
+        self._bool_masks = source._bool_masks
+        self._label_cache = source._label_cache
+
+    def init_nozzle(self, spray_mask: Optional["SprayMask"] = None):
         """
         Initialize the nozzle for this bed mesh.
 
         This method sets up the nozzle object associated with the bed mesh.
+        A prebuilt `spray_mask` is reused as is; otherwise the kernel is built from spray_function.
         """
         from .Nozzle import Nozzle
-        self._nozzle = Nozzle(owner_bed=self, nozzle_function=self.spray_function)
+        self._nozzle = Nozzle(owner_bed=self, nozzle_function=self.spray_function, spray_mask=spray_mask)
+
+    def _label_samples(self) -> Tuple[NDArray, int]:
+        """
+        Label the connected (4-connectivity) regions of the boolean mask.
+
+        Returns:
+            Tuple[NDArray, int]: The label image (0 = background) and the number of regions.
+        """
+        if self._label_cache is None:
+            # bool and uint8 share a layout, so a view avoids a conversion copy
+            mask_u8 = self.bool_mesh.view(np.uint8)
+            if cc3d is not None:
+                labeled, num_features = cc3d.connected_components(
+                    np.ascontiguousarray(mask_u8),
+                    connectivity=4,
+                    return_N=True,
+                    max_labels=len(self._bool_masks) + 1,
+                )
+            else:
+                labeled, num_features = ndimage_label(mask_u8)
+            self._label_cache = (labeled, int(num_features), None)
+        labeled, num_features, _ = self._label_cache
+        return labeled, num_features
+
+    def _get_labels(self) -> Tuple[NDArray, list]:
+        """
+        Label image of the samples together with the bounding slices of each region.
+
+        Returns:
+            Tuple[NDArray, list]: The label image and the find_objects slices (None for missing labels).
+        """
+        labeled, num_features = self._label_samples()
+        slices = self._label_cache[2]
+        if slices is None:
+            slices = find_objects(labeled)
+            self._label_cache = (labeled, num_features, slices)
+        return labeled, slices
 
     def get_std_deviation(self, overall_dev: bool = False) -> List[float]:
         """
@@ -108,16 +242,39 @@ class BedMesh:
         Returns:
             float: The standard deviation of the deposition mesh values within the boolean mask.
         """
-        result = ndimage_label(self.bool_mesh)
-        
+        # Single pass of sums and sums of squares in float64, var = E[x^2] - E[x]^2.
+        # Less stable than a centered pass, which is fine for bounded, non-negative intensities.
         if not overall_dev:
-            labeled_bool, num_features = result if isinstance(result, tuple) else (result, None)
-            depositions_masks = []
-            for i in range(1, (num_features or 0) + 1):
-                depositions_masks.append(self.deposition_mesh[labeled_bool == i])
-            devs = [float(np.std(dm)) for dm in depositions_masks if dm.size > 0]
+            labeled_bool, slices = self._get_labels()
+            num_features = len(slices)
+            # Only the bounding box of all samples can hold labelled cells; row-major order
+            # inside it is kept, so the per-region sums are the same as over the full mesh
+            boxes = [sl for sl in slices if sl is not None]
+            if boxes:
+                window = (
+                    slice(min(b[0].start for b in boxes), max(b[0].stop for b in boxes)),
+                    slice(min(b[1].start for b in boxes), max(b[1].stop for b in boxes)),
+                )
+            else:
+                window = (slice(0, 0), slice(0, 0))
+            labels = labeled_bool[window].ravel()
+            values = self.deposition_mesh[window].ravel().astype(np.float64)
+            n_bins = num_features + 1
+            counts = np.bincount(labels, minlength=n_bins)[1:]
+            s1 = np.bincount(labels, weights=values, minlength=n_bins)[1:]
+            s2 = np.bincount(labels, weights=values * values, minlength=n_bins)[1:]
+            present = counts > 0
+            n = counts[present]
+            mean = s1[present] / n
+            devs = np.sqrt(np.maximum(s2[present] / n - mean * mean, 0.0)).tolist()
         else:
-            devs = [float(np.std(self.deposition_mesh[self.bool_mesh]))]
+            values = self.deposition_mesh[self.bool_mesh].astype(np.float64)
+            n = values.size
+            if n == 0:
+                devs = [float("nan")]
+            else:
+                mean = values.sum() / n
+                devs = [float(np.sqrt(max(np.dot(values, values) / n - mean * mean, 0.0)))]
         
         return devs
 
@@ -132,9 +289,11 @@ class BedMesh:
         Raises:
             ValueError: If the keyword is not recognized.
         """
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import Rectangle
 
-        def _plot_bounding_boxes(ax, labeled, step):
-            for sl in find_objects(labeled):
+        def _plot_bounding_boxes(ax, slices, step):
+            for sl in slices:
                 if sl is not None:
                     # ndimage returns (slice for axis 0 [rows=y], slice for axis 1 [cols=x])
                     y_slice, x_slice = sl
@@ -161,15 +320,9 @@ class BedMesh:
             ax.set_xlabel('X (mm)')
             ax.set_ylabel('Y (mm)')
             ax.grid(True, linestyle='--', alpha=0.3)
-            # Ensure bool_mesh is a boolean numpy array
-            bool_mesh = np.asarray(self.bool_mesh, dtype=bool)
-            result = ndimage_label(bool_mesh)
-            if isinstance(result, tuple):
-                labeled, _ = result
-            else:
-                labeled = result
+            _, slices = self._get_labels()
             step = self.grid_step_mm
-            _plot_bounding_boxes(ax, labeled, step)
+            _plot_bounding_boxes(ax, slices, step)
         elif keyword == "boxes":
             # Optionally show mask raster with correct extent to align with grid
             dx = float(self.grid_step_mm)
@@ -178,23 +331,65 @@ class BedMesh:
                 for mask in self._bool_masks:
                     ax.imshow(mask.mask, extent=extent, origin='lower', alpha=0.25, cmap='Greys')
             # Draw rectangles corresponding to connected True regions in bool_mesh
-            bool_mesh = np.asarray(self.bool_mesh, dtype=bool)
-            result = ndimage_label(bool_mesh)
-            if isinstance(result, tuple):
-                labeled, _ = result
-            else:
-                labeled = result
+            _, slices = self._get_labels()
             ax.set_title('Boolean Mask Bounding Boxes')
             ax.set_xlabel('X (mm)')
             ax.set_ylabel('Y (mm)')
             ax.grid(True, linestyle='--', alpha=0.3)
             step = self.grid_step_mm
-            _plot_bounding_boxes(ax, labeled, step)
+            _plot_bounding_boxes(ax, slices, step)
             ax.set_xlim(0, self.size_mm)
             ax.set_ylim(0, self.size_mm)
         else:
             raise ValueError("Unknown keyword for plotting")
 
+    def plot_combined(self, ax=None, deposition: bool = True, boxes: bool = True):
+        """
+        Plot the deposition mesh and the sample bounding boxes in a single pass.
+
+        Same picture as plot("deposition") followed by plot("boxes"), but the boxes are drawn
+        once as a PatchCollection from the cached label slices and the masks are overlaid
+        with one image of bool_mesh.
+
+        Args:
+            ax: Optional axis object to plot on. If None, a new figure and axis will be created.
+            deposition (bool): Draw the deposition image and its colorbar.
+            boxes (bool): Overlay the sample masks and their bounding boxes.
+        """
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import PatchCollection
+        from matplotlib.patches import Rectangle
+
+        if ax is None:
+            fig, ax = plt.subplots()
+
+        # Use half-step padded extent so pixel centers align to coordinates (0..size)
+        dx = float(self.grid_step_mm)
+        extent = (-dx / 2.0, self.size_mm + dx / 2.0, -dx / 2.0, self.size_mm + dx / 2.0)
+        if deposition:
+            im = ax.imshow(self.deposition_mesh, extent=extent, origin='lower')
+            plt.colorbar(im, ax=ax, label='Intensity')
+            ax.set_title('Bed Mesh Deposition')
+        if boxes:
+            if self._bool_masks:
+                ax.imshow(self.bool_mesh, extent=extent, origin='lower', alpha=0.25, cmap='Greys')
+            step = self.grid_step_mm
+            _, slices = self._get_labels()
+            # ndimage slices are (rows=y, cols=x)
+            rects = [
+                Rectangle((sl[1].start * step, sl[0].start * step),
+                          (sl[1].stop - sl[1].start) * step, (sl[0].stop - sl[0].start) * step)
+                for sl in slices if sl is not None
+            ]
+            ax.add_collection(PatchCollection(rects, linewidth=2, edgecolor='red', facecolor='none', alpha=1.0))
+            ax.set_title('Boolean Mask Bounding Boxes')
+            ax.set_xlim(0, self.size_mm)
+            ax.set_ylim(0, self.size_mm)
+        ax.set_xlabel('X (mm)')
+        ax.set_ylabel('Y (mm)')
+        ax.grid(True, linestyle='--', alpha=0.3)
+        return ax
+
     def plot_bool_mask(self) -> None:
         """
         Plot the boolean mask.
@@ -214,3 +409,4 @@ class BedMesh:
         This method resets the deposition mesh to zero.
         """
         self.deposition_mesh.fill(0)
+        self._invalidate()
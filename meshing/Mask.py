@@ -1,8 +1,11 @@
 import numpy as np
 from numpy import ndarray as NDArray
+from numpy.typing import ArrayLike
 from typing import Optional, Callable, Tuple
+from scipy import fft as sp_fft
 
 from .utils import shift, boolean_function
+from ._spray_kernel import stamp_bilinear, stamp_bilinear_batch
 from .BedMesh import BedMesh
 
 
@@ -26,9 +29,20 @@ class Mask:
         steps_count = int(round(size_mm / grid_step_mm)) + 1
         self._x_space = np.linspace(bottom_limit, upper_limit, steps_count)
         self._y_space = np.linspace(bottom_limit, upper_limit, steps_count)
-        self._mesh = np.meshgrid(self._x_space, self._y_space, indexing="xy")
         # Children must set `self.mask` to a numpy array compatible with target shapes
-        self.mask = np.zeros_like(self._mesh[0], dtype=float)
+        self.mask: Optional[NDArray] = None
+        # Output buffer reused by `_shift_for`, (re)allocated to match `self.mask`
+        self._shift_buf: Optional[NDArray] = None
+
+    @property
+    def _mesh(self) -> Tuple[NDArray, NDArray]:
+        """(x, y) coordinates as broadcastable views, x of shape (1, N) and y of shape (N, 1).
+        Equivalent to an "xy" meshgrid once broadcast, without materializing N x N grids.
+        """
+        return self._x_space[None, :], self._y_space[:, None]
+
+    def _full_shape(self) -> Tuple[int, int]:
+        return self._y_space.size, self._x_space.size
 
     def _shift_for(
         self,
@@ -38,11 +52,15 @@ class Mask:
         """Compute the shifted mask for the given apply position and mask anchor.
         Note: shift() works with ij indexing, so (y, x) order for offsets.
         Use sub-pixel shifts (floats) to avoid banding artifacts.
+        The result lives in a buffer owned by the mask and is overwritten by the next call.
         """
         # Default: global shift (used by SampleMask)
         x_cells = (apply_position[0] - mask_anchor[0]) / self.grid_step_mm
         y_cells = (apply_position[1] - mask_anchor[1]) / self.grid_step_mm
-        return shift(self.mask, offset=(y_cells, x_cells), constant_values=0.0, order=1, prefilter=False)
+        buf = self._shift_buf
+        if buf is None or buf.shape != self.mask.shape or buf.dtype != self.mask.dtype:
+            buf = self._shift_buf = np.empty_like(self.mask)
+        return shift(self.mask, offset=(y_cells, x_cells), constant_values=0.0, order=1, prefilter=False, out=buf)
 
     def apply(
         self,
@@ -92,7 +110,35 @@ class SampleMask(Mask):
         self.x_size = float(xs)
         self.y_size = float(ys)
 
-        self.mask = function(self._mesh, self.bl_corner, xs, ys).astype(bool, copy=False)
+        # Default rectangles are handled from index bounds instead of full-grid evaluation,
+        # and their raster is only built if something asks for `mask`
+        self._is_rectangle = function is boolean_function
+        if not self._is_rectangle:
+            self.mask = np.broadcast_to(function(self._mesh, self.bl_corner, xs, ys), self._full_shape()).astype(bool)
+
+    @property
+    def mask(self) -> Optional[NDArray]:
+        if self._mask is None and getattr(self, "_is_rectangle", False):
+            self._mask = self._rectangle_mask(self.bl_corner, self.x_size, self.y_size)
+        return self._mask
+
+    @mask.setter
+    def mask(self, value: Optional[NDArray]) -> None:
+        self._mask = value
+
+    def _rectangle_slices(self, corner: NDArray, x_size: float, y_size: float) -> Tuple[slice, slice]:
+        """(row, col) slices of the grid cells inside the rectangle, as `boolean_function` defines it.
+        Uses searchsorted on the 1-D axes so the >= / < boundary comparisons match exactly.
+        """
+        x_lo, x_hi = np.searchsorted(self._x_space, (corner[0], corner[0] + x_size), side="left")
+        y_lo, y_hi = np.searchsorted(self._y_space, (corner[1], corner[1] + y_size), side="left")
+        return slice(y_lo, y_hi), slice(x_lo, x_hi)
+
+    def _rectangle_mask(self, corner: NDArray, x_size: float, y_size: float) -> NDArray:
+        """Rectangle mask equal to `boolean_function` on the grid, built from index bounds."""
+        mask = np.zeros(self._full_shape(), dtype=bool)
+        mask[self._rectangle_slices(corner, x_size, y_size)] = True
+        return mask
 
     def apply(
         self,
@@ -101,14 +147,23 @@ class SampleMask(Mask):
         mask_anchor: Tuple[float, float] | NDArray = (0.0, 0.0),
         time: float = 0.0,
     ) -> NDArray:
-        shifted_mask = self._shift_for(apply_position, mask_anchor).astype(bool, copy=False)
+        if self._is_rectangle and isinstance(target, BedMesh):
+            # Rasterize the rectangle at its final position directly into the bed
+            offset = np.asarray(apply_position, dtype=float) - np.asarray(mask_anchor, dtype=float)
+            target.bool_mesh[self._rectangle_slices(self.bl_corner + offset, self.x_size, self.y_size)] = True
+            target._invalidate_labels()
+            return target.bool_mesh
+
+        # self.mask is bool, and so is its shift
+        shifted_mask = self._shift_for(apply_position, mask_anchor)
 
         if isinstance(target, np.ndarray):
-            return np.logical_or(target.astype(bool, copy=False), shifted_mask)
+            return np.logical_or(target, shifted_mask)
         elif isinstance(target, BedMesh):
-            result_arr = np.logical_or(target.bool_mesh, shifted_mask)
-            target.bool_mesh = result_arr
-            return result_arr
+            # bool_mesh is always a bool array; OR in place
+            np.logical_or(target.bool_mesh, shifted_mask, out=target.bool_mesh)
+            target._invalidate_labels()
+            return target.bool_mesh
         else:
             raise TypeError(f"Unsupported target type: {type(target)!r}")
 
@@ -136,10 +191,36 @@ class SprayMask(Mask):
         self.kind = "numeric"
         if function is None:
             raise ValueError("SprayMask requires a numeric generator function (e.g., gaussian)")
-        # Build small kernel from provided function on the local mesh
-        self.mask = function(self._mesh).astype(float, copy=False)
+        # Build small kernel from provided function on the local mesh (float32, like the bed mesh)
+        self.mask = np.broadcast_to(function(self._mesh), self._full_shape()).astype(np.float32)
+        self._set_kernel_radius((self.mask.shape[0] - 1) // 2)
+
+    def _set_kernel_radius(self, r: int) -> None:
+        """Keep the centered (2r+1) x (2r+1) part of the kernel and refresh derived data."""
+        c = (self.mask.shape[0] - 1) // 2
+        self.mask = self.mask[c - r:c + r + 1, c - r:c + r + 1]
+        self._x_space = self._x_space[c - r:c + r + 1]
+        self._y_space = self._y_space[c - r:c + r + 1]
         # Precompute kernel radius in cells for window slicing
-        self._radius_cells = (self.mask.shape[0] - 1) // 2
+        self._radius_cells = r
+        # Kernel with a one-cell zero border, read by the bilinear stamp in apply()
+        self._padded_kernel = np.pad(self.mask, 1)
+        # Kernel spectra for apply_path, keyed by FFT shape
+        self._kernel_fft: dict = {}
+
+    def crop_to_support(self, rel_tol: float = 1e-4) -> int:
+        """Drop outer kernel rings whose values are all below `rel_tol` of the peak.
+        Returns the resulting radius in cells.
+        """
+        r = self._radius_cells
+        mag = np.abs(self.mask)
+        threshold = rel_tol * float(mag.max()) if mag.size else 0.0
+        # Largest Chebyshev distance from the center that still holds a significant value
+        significant = np.argwhere(mag >= threshold) - r
+        support = int(np.abs(significant).max()) if significant.size else 0
+        if support < r:
+            self._set_kernel_radius(support)
+        return self._radius_cells
 
     def apply(
         self,
@@ -148,46 +229,360 @@ class SprayMask(Mask):
         mask_anchor: Tuple[float, float] | NDArray = (0.0, 0.0),
         time: float = 0.0,
     ) -> NDArray:
-        # Shift only the small kernel by sub-pixel (fractional) offset
+        if isinstance(target, BedMesh):
+            return self.apply_bedmesh(target, apply_position, mask_anchor, time)
+        elif isinstance(target, np.ndarray):
+            # Global ndarray target (rare here) — add centered around the apply position
+            self._stamp(target, apply_position, mask_anchor, time)
+            return target
+        else:
+            raise TypeError(f"Unsupported target type: {type(target)!r}")
+
+    def apply_bedmesh(
+        self,
+        bed: BedMesh,
+        apply_position: Tuple[float, float] | NDArray = (0.0, 0.0),
+        mask_anchor: Tuple[float, float] | NDArray = (0.0, 0.0),
+        time: float = 0.0,
+    ) -> NDArray:
+        """`apply` for a known BedMesh target, without the type dispatch (used by Nozzle.spray)."""
+        # Windowed in-place add into the bed deposition mesh
+        self._stamp(bed.deposition_mesh, apply_position, mask_anchor, time)
+        bed._invalidate()
+        return bed.deposition_mesh
+
+    def _stamp(
+        self,
+        dest: NDArray,
+        apply_position: Tuple[float, float] | NDArray,
+        mask_anchor: Tuple[float, float] | NDArray,
+        time: float,
+    ) -> None:
+        # Split the sub-pixel (fractional) offset into integer cell + bilinear weights
         step = self.grid_step_mm
         ux = float(apply_position[0] - mask_anchor[0]) / step
         uy = float(apply_position[1] - mask_anchor[1]) / step
         jx = int(np.floor(ux))
         jy = int(np.floor(uy))
+        # Scale by time if provided
+        scale = float(time) if time > 0 else 1.0
+        self._add_bilinear(dest, jy, jx, uy - jy, ux - jx, scale)
+
+    def _add_bilinear(self, dest: NDArray, jy: int, jx: int, fy: float, fx: float, scale: float) -> None:
+        """Add the kernel shifted by (fy, fx) cells, centered at (jy, jx), into `dest`.
+
+        The shift is a 4-tap bilinear blend of the zero-padded kernel, kept inside the
+        unshifted (2r+1)-cell window (jy - r) .. (jy + r) like a constant-mode
+        `ndimage.shift` of the kernel: the fraction pushed past the far edge is dropped,
+        and a nonzero fraction leaves the near edge row/column empty, so the window
+        starts one cell later there. Clipped to `dest`.
+        """
+        r = self._radius_cells
+        H, W = dest.shape
+        bed_y0 = max(0, jy - r + (fy > 0.0))
+        bed_y1 = min(H, jy + r + 1)
+        bed_x0 = max(0, jx - r + (fx > 0.0))
+        bed_x1 = min(W, jx + r + 1)
+        if bed_y1 <= bed_y0 or bed_x1 <= bed_x0:
+            return
+        self._add_window(dest, bed_y0, bed_y1, bed_x0, bed_x1,
+                         bed_y0 - (jy - r), bed_x0 - (jx - r), fy, fx, scale)
+
+    def _add_window(self, dest: NDArray, bed_y0: int, bed_y1: int, bed_x0: int, bed_x1: int,
+                    ker_y0: int, ker_x0: int, fy: float, fx: float, scale: float) -> None:
+        """Blend the kernel into the non-empty, already clipped window dest[bed_y0:bed_y1, bed_x0:bed_x1]."""
+        if stamp_bilinear is not None:
+            stamp_bilinear(dest, self._padded_kernel, bed_y0, bed_y1, bed_x0, bed_x1, ker_y0, ker_x0, fy, fx, scale)
+            return
+        ker_y1 = ker_y0 + (bed_y1 - bed_y0)
+        ker_x1 = ker_x0 + (bed_x1 - bed_x0)
+        # Padded kernel kp has the kernel at [1:-1, 1:-1]; tile cell (a, b) blends kp[a:a+2, b:b+2]
+        kp = self._padded_kernel
+        # Separable blend: along x over the h+1 source rows, then along y with the time
+        # scale folded into the y weights, so scaling costs no extra pass over the tile
+        kp_rows = slice(ker_y0, ker_y1 + 1)
+        rows = kp[kp_rows, ker_x0 + 1:ker_x1 + 1] * (1.0 - fx) + kp[kp_rows, ker_x0:ker_x1] * fx
+        dest[bed_y0:bed_y1, bed_x0:bed_x1] += rows[1:] * ((1.0 - fy) * scale) + rows[:-1] * (fy * scale)
+
+    def apply_batch(
+        self,
+        target: BedMesh,
+        positions: ArrayLike,
+        times: ArrayLike,
+        mask_anchor: Tuple[float, float] | NDArray = (0.0, 0.0),
+    ) -> NDArray:
+        """Stamp the kernel at many positions, as repeated `apply` calls would.
+
+        Batches dense enough that a windowed FFT convolution is cheaper (e.g. sub-steps along
+        a straight segment, whose stamps fuse into one streak) go through the same convolution
+        as `apply_path`, equal to `apply` up to rounding.
+
+        Otherwise cell indices, bilinear weights and clipped window bounds are computed for
+        the whole batch up front; only stamps whose window overlaps the bed are visited.
+        With numba installed the whole batch is stamped in one compiled loop. Without it,
+        stamps whose window lies fully inside the bed skip clipping and are blended and
+        scattered together (equal to `apply` up to rounding); the few edge stamps go
+        through the clipped per-stamp path.
+        """
+        if not isinstance(target, BedMesh):
+            raise TypeError(f"Unsupported target type: {type(target)!r}")
+        pos = np.asarray(positions, dtype=float).reshape(-1, 2)
+        scale = np.broadcast_to(np.asarray(times, dtype=float), (pos.shape[0],))
+        # Same scaling rule as apply(): non-positive times deposit the bare kernel
+        scale = np.where(scale > 0, scale, 1.0)
+
+        step = self.grid_step_mm
+        r = self._radius_cells
+        mesh = target.deposition_mesh
+        H, W = mesh.shape
+        ux = (pos[:, 0] - mask_anchor[0]) / step
+        uy = (pos[:, 1] - mask_anchor[1]) / step
+        jx = np.floor(ux)
+        jy = np.floor(uy)
         fx = ux - jx
         fy = uy - jy
-        # Sub-pixel shift (y, x) and scale by time if provided
-        shifted_tile = shift(self.mask, offset=(fy, fx), constant_values=0.0, order=1, prefilter=False)
-        if time > 0:
-            shifted_tile = shifted_tile * time
+        jx = jx.astype(np.intp)
+        jy = jy.astype(np.intp)
+        if self._fft_is_cheaper(jy, jx, H, W):
+            self._convolve_impulses(mesh, jy, jx, fy, fx, scale)
+            target._invalidate()
+            return mesh
 
-        if isinstance(target, np.ndarray):
-            # Global ndarray target (rare here) — add centered around (jy, jx)
-            r = self._radius_cells
-            H, W = target.shape
-            bed_y0 = max(0, jy - r)
-            bed_y1 = min(H, jy + r + 1)
-            bed_x0 = max(0, jx - r)
-            bed_x1 = min(W, jx + r + 1)
-            ker_y0 = r - (jy - bed_y0)
-            ker_y1 = ker_y0 + (bed_y1 - bed_y0)
-            ker_x0 = r - (jx - bed_x0)
-            ker_x1 = ker_x0 + (bed_x1 - bed_x0)
-            target[bed_y0:bed_y1, bed_x0:bed_x1] += shifted_tile[ker_y0:ker_y1, ker_x0:ker_x1]
-            return target
-        elif isinstance(target, BedMesh):
-            # Windowed in-place add into the bed deposition mesh
-            r = self._radius_cells
-            H, W = target.deposition_mesh.shape
-            bed_y0 = max(0, jy - r)
-            bed_y1 = min(H, jy + r + 1)
-            bed_x0 = max(0, jx - r)
-            bed_x1 = min(W, jx + r + 1)
-            ker_y0 = r - (jy - bed_y0)
-            ker_y1 = ker_y0 + (bed_y1 - bed_y0)
-            ker_x0 = r - (jx - bed_x0)
-            ker_x1 = ker_x0 + (bed_x1 - bed_x0)
-            target.deposition_mesh[bed_y0:bed_y1, bed_x0:bed_x1] += shifted_tile[ker_y0:ker_y1, ker_x0:ker_x1]
-            return target.deposition_mesh
-        else:
+        # Same windows as _add_bilinear
+        bed_y0 = np.clip(jy - r + (fy > 0.0), 0, H)
+        bed_y1 = np.clip(jy + r + 1, 0, H)
+        bed_x0 = np.clip(jx - r + (fx > 0.0), 0, W)
+        bed_x1 = np.clip(jx + r + 1, 0, W)
+        hit = (bed_y1 > bed_y0) & (bed_x1 > bed_x0)
+        if stamp_bilinear is None:
+            interior = (jy - r >= 0) & (jy + r + 1 <= H) & (jx - r >= 0) & (jx + r + 1 <= W)
+            inner = np.flatnonzero(interior)
+            if inner.size >= self._MIN_SCATTER_BATCH:
+                self._scatter_interior(mesh, jy[inner] - r, jx[inner] - r, fy[inner], fx[inner], scale[inner])
+                hit &= ~interior
+        hit = np.flatnonzero(hit)
+        if hit.size and stamp_bilinear_batch is not None:
+            stamp_bilinear_batch(
+                mesh, self._padded_kernel,
+                bed_y0[hit], bed_y1[hit], bed_x0[hit], bed_x1[hit],
+                (bed_y0 - (jy - r))[hit], (bed_x0 - (jx - r))[hit],
+                fy[hit], fx[hit], scale[hit],
+            )
+        elif hit.size:
+            columns = (
+                bed_y0[hit], bed_y1[hit], bed_x0[hit], bed_x1[hit],
+                (bed_y0 - (jy - r))[hit], (bed_x0 - (jx - r))[hit],
+                fy[hit], fx[hit], scale[hit],
+            )
+            add_window = self._add_window
+            # tolist() hands plain Python scalars to the per-stamp slicing
+            for args in zip(*(c.tolist() for c in columns)):
+                add_window(mesh, *args)
+        target._invalidate()
+        return mesh
+
+    # Below this many interior stamps the per-stamp path is cheaper than the batched scatter
+    _MIN_SCATTER_BATCH = 4
+    # Upper bound on stamp-tile elements blended at once by the scatter path
+    _SCATTER_CHUNK_ELEMS = 1 << 16
+
+    def _scatter_interior(self, dest: NDArray, y0: NDArray, x0: NDArray, fy: NDArray, fx: NDArray,
+                          scale: NDArray) -> None:
+        """Add full (unclipped) stamps with top-left cells (y0, x0) into `dest`.
+
+        Each tile is the same 4-tap blend as `_add_window` over the full (2r+1)-cell window,
+        written as a (n, 4) x (4, S*S) product over the one-cell-shifted views of the padded
+        kernel, with the near edge row/column cleared for nonzero fractions; tiles are then
+        summed into the stamps' bounding box with a single bincount.
+        """
+        kp = self._padded_kernel
+        S = 2 * self._radius_cells + 1
+        taps = np.stack((kp[1:-1, 1:-1], kp[1:-1, :-2], kp[:-2, 1:-1], kp[:-2, :-2])).reshape(4, S * S)
+        taps = taps.astype(np.float64)
+        weights = np.stack((
+            (1.0 - fy) * (1.0 - fx), (1.0 - fy) * fx, fy * (1.0 - fx), fy * fx,
+        ), axis=1) * scale[:, None]
+        cell = np.arange(S)
+        chunk = max(1, self._SCATTER_CHUNK_ELEMS // (S * S))
+        for lo in range(0, y0.size, chunk):
+            cy, cx = y0[lo:lo + chunk], x0[lo:lo + chunk]
+            top, left = int(cy.min()), int(cx.min())
+            box_h, box_w = int(cy.max()) + S - top, int(cx.max()) + S - left
+            offsets = (cell[:, None] * box_w + cell[None, :]).ravel()
+            idx = ((cy - top) * box_w + (cx - left))[:, None] + offsets[None, :]
+            tiles = (weights[lo:lo + chunk] @ taps).reshape(-1, S, S)
+            tiles[fy[lo:lo + chunk] > 0.0, 0, :] = 0.0
+            tiles[fx[lo:lo + chunk] > 0.0, :, 0] = 0.0
+            acc = np.bincount(idx.ravel(), weights=tiles.ravel(), minlength=box_h * box_w)
+            view = dest[top:top + box_h, left:left + box_w]
+            view += acc.reshape(box_h, box_w).astype(dest.dtype, copy=False)
+
+    def apply_path(
+        self,
+        target: BedMesh,
+        positions: ArrayLike,
+        times: ArrayLike,
+        mask_anchor: Tuple[float, float] | NDArray = (0.0, 0.0),
+    ) -> NDArray:
+        """Add the kernel at many positions with a single FFT convolution.
+
+        Batched counterpart of `apply` for a BedMesh target: each stamp is split bilinearly
+        over the four neighbouring cells of an impulse grid, which is then convolved with
+        the kernel and added onto the bed deposition mesh. The grid only spans the bounding
+        box of the stamps, so a short path costs a small FFT. Matches repeated `apply`
+        calls up to floating-point rounding.
+        """
+        if not isinstance(target, BedMesh):
             raise TypeError(f"Unsupported target type: {type(target)!r}")
+        pos = np.asarray(positions, dtype=float).reshape(-1, 2)
+        weights = np.broadcast_to(np.asarray(times, dtype=float), (pos.shape[0],))
+        # Same scaling rule as apply(): non-positive times deposit the bare kernel
+        weights = np.where(weights > 0, weights, 1.0)
+
+        step = self.grid_step_mm
+        ux = (pos[:, 0] - mask_anchor[0]) / step
+        uy = (pos[:, 1] - mask_anchor[1]) / step
+        jx = np.floor(ux)
+        jy = np.floor(uy)
+        fx = ux - jx
+        fy = uy - jy
+        mesh = target.deposition_mesh
+        self._convolve_impulses(mesh, jy.astype(np.intp), jx.astype(np.intp), fy, fx, weights)
+        target._invalidate()
+        return mesh
+
+    # Kernel variant spectra kept per FFT shape; windowed paths come in many shapes, so keep a few
+    _KERNEL_FFT_CACHE_SIZE = 16
+
+    def _impulse_window(self, jy: NDArray, jx: NDArray, H: int, W: int) -> Optional[Tuple[int, int, int, int]]:
+        """Inclusive (y_lo, y_hi, x_lo, x_hi) bounds of the impulse cells that stamps at (jy, jx)
+        touch and whose kernel still reaches an H x W bed, or None if there are none.
+        """
+        if jy.size == 0:
+            return None
+        r = self._radius_cells
+        # Impulse cells (jy + {0,1}, jx + {0,1}) whose kernel reaches the bed lie in [-r, H - 1 + r]
+        y_lo = max(int(jy.min()), -r)
+        y_hi = min(int(jy.max()) + 1, H - 1 + r)
+        x_lo = max(int(jx.min()), -r)
+        x_hi = min(int(jx.max()) + 1, W - 1 + r)
+        if y_hi < y_lo or x_hi < x_lo:
+            return None
+        return y_lo, y_hi, x_lo, x_hi
+
+    def _fft_is_cheaper(self, jy: NDArray, jx: NDArray, H: int, W: int) -> bool:
+        """Whether one windowed FFT convolution beats stamping each of the given positions.
+
+        Stamping costs about (2r+1)^2 multiply-adds per stamp; each transform about A log2 A
+        for the padded window area A, with a similar constant, and the convolution usually
+        takes five (four window parts forward, one inverse), about twice the classic pair.
+        Dense paths (serpentine rows) favour the FFT several times over, a few far-apart stamps
+        favour stamping.
+        """
+        window = self._impulse_window(jy, jx, H, W)
+        if window is None:
+            return False
+        r = self._radius_cells
+        y_lo, y_hi, x_lo, x_hi = window
+        area = float(y_hi - y_lo + 1 + 2 * r) * float(x_hi - x_lo + 1 + 2 * r)
+        stamp_cost = float(jy.size) * (2 * r + 1) ** 2
+        return stamp_cost > 2.0 * area * np.log2(area)
+
+    def _convolve_impulses(self, dest: NDArray, jy: NDArray, jx: NDArray, fy: NDArray, fx: NDArray,
+                           weights: NDArray) -> None:
+        """Add stamps with cells (jy, jx) and fractions (fy, fx) into `dest` by one FFT convolution
+        over the stamps' bounding box (clipped to the impulse cells that can reach `dest`).
+
+        Along each axis a stamp's window (see `_add_bilinear`) is split into parts over whole
+        cells (`_window_parts`), each convolving an impulse with a kernel variant that lacks
+        the edge row/column the window drops. The convolution runs in float64 and cells outside
+        every stamp window are cleared afterwards, so untouched cells stay exactly zero as
+        with direct stamping.
+        """
+        r = self._radius_cells
+        H, W = dest.shape
+        window = self._impulse_window(jy, jx, H, W)
+        if window is None:
+            return
+        y_lo, y_hi, x_lo, x_hi = window
+        ih, iw = y_hi - y_lo + 1, x_hi - x_lo + 1
+
+        # Each (y part, x part) pair is its own impulse grid convolved with its kernel variant;
+        # the spectra are summed so a single inverse FFT covers them all
+        full_shape = (ih + 2 * r, iw + 2 * r)
+        fshape = tuple(sp_fft.next_fast_len(d, real=True) for d in full_shape)
+        spectrum = None
+        for vy, dy, wy in self._window_parts(fy):
+            for vx, dx, wx in self._window_parts(fx):
+                w = weights * wy * wx
+                iy = jy + (dy - y_lo)
+                ix = jx + (dx - x_lo)
+                inside = (iy >= 0) & (iy < ih) & (ix >= 0) & (ix < iw) & (w != 0.0)
+                if not inside.any():
+                    continue
+                impulse = np.bincount(iy[inside] * iw + ix[inside], weights=w[inside], minlength=ih * iw)
+                term = sp_fft.rfft2(impulse.reshape(ih, iw), fshape) * self._kernel_variant_fft(fshape, vy, vx)
+                spectrum = term if spectrum is None else spectrum + term
+        if spectrum is None:
+            return
+        full = sp_fft.irfft2(spectrum, fshape)
+        # Bed cell c receives impulse a through kernel tap b when c = a + b - r, so full[i]
+        # lands on bed row y_lo - r + i (likewise for columns); keep the part on the bed
+        oy, ox = y_lo - r, x_lo - r
+        by0, by1 = max(oy, 0), min(oy + full_shape[0], H)
+        bx0, bx1 = max(ox, 0), min(ox + full_shape[1], W)
+        region = full[by0 - oy:by1 - oy, bx0 - ox:bx1 - ox]
+        # FFT round-off leaves small nonzero (possibly negative) values away from the stamps
+        region[~self._window_support(region.shape, jy - by0, jx - bx0, fy, fx)] = 0.0
+        dest[by0:by1, bx0:bx1] += region
+
+    # Kernel edge variants: 0 drops the first row/column, 1 drops the last, 2 keeps only the first
+    _EDGE_VARIANTS = 3
+
+    @staticmethod
+    def _window_parts(f: NDArray) -> Tuple[Tuple[int, int, NDArray], ...]:
+        """(kernel variant, impulse offset, weight) parts of the stamp windows along one axis.
+
+        With fraction f the window holds (1 - f) * kernel[i] + f * kernel[i - 1] at offsets
+        i = 1 .. 2r, and the whole kernel when f == 0: the kernel minus its first row at the
+        stamp cell, the kernel minus its last row one cell further, and the first row alone for
+        whole-cell positions.
+        """
+        return ((0, 0, 1.0 - f), (1, 1, f), (2, 0, (f == 0.0).astype(float)))
+
+    def _kernel_variant_fft(self, fshape: Tuple[int, int], vy: int, vx: int) -> NDArray:
+        """Cached spectrum, zero-padded to `fshape`, of the kernel with edge variant (vy, vx)."""
+        key = (fshape, vy, vx)
+        spectrum = self._kernel_fft.get(key)
+        if spectrum is None:
+            if len(self._kernel_fft) >= self._KERNEL_FFT_CACHE_SIZE:
+                self._kernel_fft.clear()
+            n = self.mask.shape[0]
+            edge = np.ones((self._EDGE_VARIANTS, n))
+            edge[0, 0] = edge[1, -1] = 0.0
+            edge[2, 1:] = 0.0
+            variant = self.mask.astype(np.float64) * edge[vy][:, None] * edge[vx][None, :]
+            spectrum = sp_fft.rfft2(variant, fshape)
+            self._kernel_fft[key] = spectrum
+        return spectrum
+
+    def _window_support(self, shape: Tuple[int, int], jy: NDArray, jx: NDArray, fy: NDArray,
+                        fx: NDArray) -> NDArray:
+        """Boolean mask of the cells of a `shape` grid covered by at least one `_add_bilinear` window.
+
+        Each window adds +1/-1 at its four corners of a difference grid (one bincount), whose
+        2-D running sum then counts the windows covering each cell.
+        """
+        r = self._radius_cells
+        h, w = shape
+        y0 = np.clip(jy - r + (fy > 0.0), 0, h)
+        y1 = np.clip(jy + r + 1, 0, h)
+        x0 = np.clip(jx - r + (fx > 0.0), 0, w)
+        x1 = np.clip(jx + r + 1, 0, w)
+        hit = (y1 > y0) & (x1 > x0)
+        y0, y1, x0, x1 = y0[hit], y1[hit], x0[hit], x1[hit]
+        ones = np.ones(y0.size)
+        corners = np.concatenate((y0 * (w + 1) + x0, y0 * (w + 1) + x1, y1 * (w + 1) + x0, y1 * (w + 1) + x1))
+        signs = np.concatenate((ones, -ones, -ones, ones))
+        counts = np.bincount(corners, weights=signs, minlength=(h + 1) * (w + 1)).reshape(h + 1, w + 1)
+        return counts.cumsum(axis=0).cumsum(axis=1)[:h, :w] > 0.5
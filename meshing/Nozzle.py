@@ -1,13 +1,11 @@
 import numpy as np
 from numpy import ndarray as NDArray
 from typing import Optional, Callable, Tuple
-from scipy.ndimage import shift
-from functools import singledispatch
-from .utils import boolean_function
 from .BedMesh import BedMesh
 
 class Nozzle:
-    def __init__(self, nozzle_function: Optional[Callable], owner_bed: "BedMesh"):
+    def __init__(self, nozzle_function: Optional[Callable], owner_bed: "BedMesh",
+                 kernel_radius_mm: Optional[float] = None, spray_mask: Optional["SprayMask"] = None):
         from wrapper.Config import Config
 
         # Create a mesh equal to the bed but will apply gaussian
@@ -22,14 +20,19 @@ class Nozzle:
         # Spray mask
         from .Mask import SprayMask
         self.spray_mask = None
-        if nozzle_function is not None:
+        if spray_mask is not None:
+            # Prebuilt kernel shared by reference (e.g. across the beds of a stride sweep)
+            self.spray_mask = spray_mask
+        elif nozzle_function is not None:
             # Compute kernel diameter from current Z via Config
             z = Config().get_height()
             diameter_mm = Config()._get_diameter_for_z(z)
             if diameter_mm <= 0:
                 # Fallback to small default if configuration returns invalid value
                 diameter_mm = max(self.step * 3.0, 1.0)
-            radius_mm = diameter_mm / 2.0
+            # Kernel extent defaults to the spray diameter; trimmed below to its effective support
+            radius_mm = kernel_radius_mm if kernel_radius_mm is not None else diameter_mm / 2.0
+            diameter_mm = 2.0 * radius_mm
             # Build a small, centered kernel in [-radius, +radius]
             self.spray_mask = SprayMask(
                 size_mm=diameter_mm,
@@ -38,8 +41,10 @@ class Nozzle:
                 bottom_limit=-radius_mm,
                 upper_limit=+radius_mm,
             )
+            self.spray_mask.crop_to_support()
+        if self.spray_mask is not None:
             # Diagnostics: expose kernel size and kernel mesh
-            self.spray_diameter_mm = diameter_mm
+            self.spray_diameter_mm = 2.0 * self.spray_mask._radius_cells * self.step
             self.spray_mask_mesh = self.spray_mask.mask
 
     def spray(self, apply_position: Tuple[float, float] | NDArray = (0, 0), time: float = 0) -> None:
@@ -48,13 +53,25 @@ class Nozzle:
             raise ValueError("No spray function configured for this nozzle")
         # Kernel is centered at 0,0 in its local coordinates
         mask_anchor = (0.0, 0.0)
-        self.spray_mask.apply(
+        self.spray_mask.apply_bedmesh(
             self._bed,
             apply_position=apply_position,
             mask_anchor=mask_anchor,
             time=time
         )
 
+    def spray_batch(self, positions: NDArray, times: NDArray | float) -> None:
+        """Apply the spray mask at many positions, stamp by stamp, with the bookkeeping vectorized."""
+        if self.spray_mask is None:
+            raise ValueError("No spray function configured for this nozzle")
+        self.spray_mask.apply_batch(self._bed, positions, times, mask_anchor=(0.0, 0.0))
+
+    def spray_path(self, positions: NDArray, times: NDArray | float) -> None:
+        """Apply the spray mask at many positions at once (one FFT convolution)."""
+        if self.spray_mask is None:
+            raise ValueError("No spray function configured for this nozzle")
+        self.spray_mask.apply_path(self._bed, positions, times, mask_anchor=(0.0, 0.0))
+
     def plot(self) -> None:
         """Plot the nozzle mesh."""
         if self.spray_mask is None:
@@ -1,4 +1,4 @@
-from .utils import boolean_function, shift
+from .utils import boolean_function, boolean_function_1d, shift
 from .Mask import Mask,SampleMask,SprayMask
 from .BedMesh import BedMesh
 from .Nozzle import Nozzle
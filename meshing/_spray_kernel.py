@@ -0,0 +1,46 @@
+"""Optional Numba-compiled spray stamp used by SprayMask when numba is installed."""
+import numpy as np
+
+try:
+    # Optional: compiled per-stamp loop instead of a handful of NumPy passes per spray
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, nogil=True)
+    def stamp_bilinear(dest, kp, bed_y0, bed_y1, bed_x0, bed_x1, ker_y0, ker_x0, fy, fx, scale):
+        """Add the padded kernel `kp`, shifted by (fy, fx), into dest[bed_y0:bed_y1, bed_x0:bed_x1].
+        Same blend as SprayMask._add_window; nogil so optimizer worker threads run in parallel.
+        """
+        w_at = (1.0 - fy) * scale
+        w_below = fy * scale
+        for i in range(bed_y1 - bed_y0):
+            a = ker_y0 + i
+            for j in range(bed_x1 - bed_x0):
+                b = ker_x0 + j
+                at = kp[a + 1, b + 1] * (1.0 - fx) + kp[a + 1, b] * fx
+                below = kp[a, b + 1] * (1.0 - fx) + kp[a, b] * fx
+                dest[bed_y0 + i, bed_x0 + j] += at * w_at + below * w_below
+
+    @njit(cache=True, fastmath=True, nogil=True)
+    def stamp_bilinear_batch(dest, kp, bed_y0, bed_y1, bed_x0, bed_x1, ker_y0, ker_x0, fy, fx, scale):
+        """Run `stamp_bilinear` for every row of the per-stamp bound/weight arrays.
+        Keeps a whole SprayMask.apply_batch call (or a flushed Scheduler queue) in compiled code.
+        """
+        for k in range(bed_y0.shape[0]):
+            stamp_bilinear(dest, kp, bed_y0[k], bed_y1[k], bed_x0[k], bed_x1[k],
+                           ker_y0[k], ker_x0[k], fy[k], fx[k], scale[k])
+
+    # Compile for the bed/kernel dtype up front so the first spray of a sweep pays no JIT cost
+    stamp_bilinear(np.zeros((2, 2), dtype=np.float32), np.zeros((3, 3), dtype=np.float32),
+                   0, 1, 0, 1, 0, 0, 0.0, 0.0, 1.0)
+    _idx = np.zeros(1, dtype=np.intp)
+    _w = np.zeros(1)
+    stamp_bilinear_batch(np.zeros((2, 2), dtype=np.float32), np.zeros((3, 3), dtype=np.float32),
+                         _idx, _idx + 1, _idx, _idx + 1, _idx, _idx, _w, _w, _w + 1.0)
+    del _idx, _w
+else:
+    stamp_bilinear = None
+    stamp_bilinear_batch = None
@@ -5,20 +5,102 @@ from typing import Optional, Callable, Tuple, Iterable, List
 
 
 
+def boolean_function_1d(xs: NDArray, ys: NDArray, corner1: NDArray | Tuple[float, float],
+                        x_size: float = 1.0, y_size: float = 1.0) -> NDArray:
+    """Rectangle mask on the grid spanned by 1-D axes `xs` (columns) and `ys` (rows).
+    Each axis is compared once; only the final outer & produces the (len(ys), len(xs)) grid.
+    """
+    x1c, y1c, x2c, y2c = corner1[0], corner1[1], corner1[0] + x_size, corner1[1] + y_size
+    # Same comparisons as boolean_function, done per axis
+    x_in = (xs >= x1c) & (xs < x2c)
+    y_in = (ys >= y1c) & (ys < y2c)
+    return y_in[:, None] & x_in[None, :]
+
+
 def boolean_function(mesh: Tuple[NDArray, NDArray], corner1: NDArray |
                      Tuple[float, float], x_size: float = 1.0, y_size: float = 1.0) -> NDArray:
     """Generates a boolean mask based on a threshold."""
-    x1c, y1c, x2c, y2c = corner1[0], corner1[1], corner1[0] + x_size, corner1[1] + y_size
-
     x, y = mesh
+    if x.ndim == 2 and y.ndim == 2 and x.shape[0] == 1 and y.shape[1] == 1:
+        # Broadcastable axes (as Mask._mesh hands out): work on the 1-D vectors
+        return boolean_function_1d(x[0], y[:, 0], corner1, x_size, y_size)
+    x1c, y1c, x2c, y2c = corner1[0], corner1[1], corner1[0] + x_size, corner1[1] + y_size
     # Inclusive on bottom-left, exclusive on top-right to avoid boundary overlaps between adjacent samples
     # TODO Float issues on comparison
-    return np.logical_and(np.logical_and(x >= x1c, x < x2c), np.logical_and(y >= y1c, y < y2c))
+    return ((x >= x1c) & (x < x2c)) & ((y >= y1c) & (y < y2c))
+
+
+def _shift_int(src: NDArray, offsets: Tuple[int, ...], out: NDArray, constant_values: float = 0.0) -> NDArray:
+    """Integer shift: fill `out` with `constant_values`, then copy the overlapping block."""
+    out.fill(constant_values)
+    dst_sl, src_sl = [], []
+    for s, n in zip(offsets, src.shape):
+        if abs(s) >= n:
+            return out
+        dst_sl.append(slice(max(s, 0), n + min(s, 0)))
+        src_sl.append(slice(max(-s, 0), n - max(s, 0)))
+    out[tuple(dst_sl)] = src[tuple(src_sl)]
+    return out
+
+
+def _shift_linear_axis(src: NDArray, s: float, axis: int, out: Optional[NDArray] = None) -> Tuple[NDArray, slice]:
+    """Linear shift along one axis, matching ndimage 'constant' mode with zero fill.
+    Returns the shifted array and the slice of output cells that map inside the input.
+    `out` must not alias `src`.
+    """
+    n = src.shape[axis]
+    m = int(np.floor(s))
+    f = s - m
+    if out is None:
+        out = np.zeros_like(src)
+    else:
+        out.fill(0)
+    idx = [slice(None)] * src.ndim
+    if f == 0.0:
+        lo, hi = max(0, m), min(n, n + m)
+        if lo < hi:
+            idx[axis] = slice(lo, hi)
+            src_idx = list(idx)
+            src_idx[axis] = slice(lo - m, hi - m)
+            out[tuple(idx)] = src[tuple(src_idx)]
+        return out, slice(lo, max(lo, hi))
+    # out[i] = f * src[i - m - 1] + (1 - f) * src[i - m], valid for m + 1 <= i <= m + n - 1
+    lo, hi = max(0, m + 1), min(n, m + n)
+    if lo < hi:
+        idx[axis] = slice(lo, hi)
+        below = list(idx)
+        below[axis] = slice(lo - m - 1, hi - m - 1)
+        at = list(idx)
+        at[axis] = slice(lo - m, hi - m)
+        out[tuple(idx)] = f * src[tuple(below)] + (1.0 - f) * src[tuple(at)]
+    return out, slice(lo, max(lo, hi))
+
+
+def _shift_bilinear(src: NDArray, offsets: Tuple[float, ...], constant_values: float = 0.0,
+                    out: Optional[NDArray] = None) -> NDArray:
+    """Separable (bi)linear shift with constant fill for cells mapped outside the input."""
+    res = src
+    valid = []
+    last = len(offsets) - 1
+    for axis, s in enumerate(offsets):
+        # Only the final pass writes into the caller's buffer; earlier passes need scratch space
+        res, sl = _shift_linear_axis(res, s, axis, out=out if axis == last else None)
+        valid.append(sl)
+    if constant_values != 0.0:
+        # Cells invalid along any axis take the fill value
+        inside = res[tuple(valid)].copy()
+        res.fill(constant_values)
+        res[tuple(valid)] = inside
+    return res
 
 
-def shift(array: NDArray, offset: ArrayLike, constant_values: float = 0.0, order: int = 1, mode: str = 'constant', prefilter: bool = False) -> NDArray:
+def shift(array: NDArray, offset: ArrayLike, constant_values: float = 0.0, order: int = 1, mode: str = 'constant', prefilter: bool = False,
+          out: Optional[NDArray] = None) -> NDArray:
     """
-    Sub-pixel array shift using scipy.ndimage.shift.
+    Sub-pixel array shift.
+
+    Integer offsets (to within 1e-9 cells) and order=1 shifts of float arrays with
+    mode='constant' are done with NumPy slicing; anything else goes through scipy.ndimage.shift.
 
     Parameters
     - array: input ndarray.
@@ -27,19 +109,84 @@ def shift(array: NDArray, offset: ArrayLike, constant_values: float = 0.0, order
     - order: interpolation order (0=nearest, 1=bilinear, 3=cubic, ...).
     - mode: how to handle borders (default 'constant').
     - prefilter: passed through to ndimage.shift (relevant for order>1). Default False for speed with order=1.
+    - out: optional preallocated array (same shape and dtype as `array`, not aliasing it) to write into.
 
-    Returns shifted copy of `array`.
+    Returns shifted copy of `array`, or `out` when given.
     """
-    from scipy.ndimage import shift as ndi_shift
     arr = np.asarray(array)
     off = np.asarray(offset, dtype=float).reshape(-1)
     assert off.size == arr.ndim, "offset must have one value per array dimension"
+    if mode == 'constant':
+        off_int = np.rint(off)
+        # Offsets within rounding noise of whole cells need no interpolation at all
+        if np.all(np.abs(off - off_int) <= 1e-9):
+            return _shift_int(arr, tuple(int(o) for o in off_int), np.empty_like(arr) if out is None else out, constant_values)
+        if order == 1 and np.issubdtype(arr.dtype, np.floating):
+            return _shift_bilinear(arr, tuple(off.tolist()), float(constant_values), out=out)
+    from scipy.ndimage import shift as ndi_shift
+    if out is not None:
+        ndi_shift(arr, shift=tuple(off.tolist()), output=out, order=order, mode=mode, cval=float(constant_values), prefilter=prefilter)
+        return out
     return ndi_shift(arr, shift=tuple(off.tolist()), order=order, mode=mode, cval=float(constant_values), prefilter=prefilter)
 
 
+def shift_stack(array: NDArray, offsets: ArrayLike, constant_values: float = 0.0) -> NDArray:
+    """
+    Many constant-mode shifts of one 2-D array, gathered from a single padded copy.
+
+    Equivalent to stacking `shift(array, off, constant_values, order=1)` for every
+    (dy, dx) in `offsets`; fractional offsets need a floating-point array.
+
+    Returns an array of shape (N, H, W).
+    """
+    arr = np.asarray(array)
+    assert arr.ndim == 2, "shift_stack expects a 2-D array"
+    off = np.asarray(offsets, dtype=float).reshape(-1, 2)
+    off_int = np.rint(off)
+    integral = np.abs(off - off_int) <= 1e-9
+    # Same rule as shift(): near-integer offsets are whole-cell moves
+    off = np.where(integral, off_int, off)
+    m = np.floor(off)
+    f = off - m
+    fractional = not integral.all()
+    assert not fractional or np.issubdtype(arr.dtype, np.floating), "fractional shifts need a float array"
+    m = m.astype(np.intp)
+
+    pad = int(np.abs(m).max(initial=0)) + 1
+    padded = np.pad(arr, pad, constant_values=constant_values)
+    taps, valid = [], []
+    for axis, n in enumerate(arr.shape):
+        i = np.arange(n)
+        # out[i] = f * src[i - m - 1] + (1 - f) * src[i - m]; inside for m + (f > 0) <= i <= m + n - 1
+        at = i[None, :] - m[:, axis, None] + pad
+        lo = m[:, axis, None] + (f[:, axis, None] > 0)
+        valid.append((i[None, :] >= lo) & (i[None, :] <= m[:, axis, None] + n - 1))
+        taps.append((at, at - 1))
+    (y_at, y_below), (x_at, x_below) = taps
+    inside = valid[0][:, :, None] & valid[1][:, None, :]
+    y_at, y_below = y_at[:, :, None], y_below[:, :, None]
+    x_at, x_below = x_at[:, None, :], x_below[:, None, :]
+
+    if not fractional:
+        stacked = padded[y_at, x_at]
+    else:
+        w = f.astype(arr.dtype)
+        fy, fx = w[:, 0, None, None], w[:, 1, None, None]
+        rows_at = padded[y_at, x_at] * (1 - fx) + padded[y_at, x_below] * fx
+        rows_below = padded[y_below, x_at] * (1 - fx) + padded[y_below, x_below] * fx
+        stacked = rows_at * (1 - fy) + rows_below * fy
+    stacked[~inside] = constant_values
+    return stacked
+
+
 def shift_batch(array: NDArray, offsets: Iterable[Tuple[float, float]], constant_values: float = 0.0, order: int = 1, mode: str = 'constant', prefilter: bool = False) -> List[NDArray]:
     """
     Convenience to compute many shifted versions of the same array.
     Useful for precomputing a cache for common sub-pixel offsets.
+    Constant-mode bilinear shifts of 2-D arrays are gathered in one go by `shift_stack`.
     """
-    return [shift(array, off, constant_values=constant_values, order=order, mode=mode, prefilter=prefilter) for off in offsets]
+    arr = np.asarray(array)
+    offsets = list(offsets)
+    if mode == 'constant' and order == 1 and arr.ndim == 2 and np.issubdtype(arr.dtype, np.floating) and offsets:
+        return list(shift_stack(arr, offsets, constant_values=constant_values))
+    return [shift(arr, off, constant_values=constant_values, order=order, mode=mode, prefilter=prefilter) for off in offsets]
@@ -7,14 +7,60 @@ from datetime import datetime
 from typing import List, Optional, Callable
 from logging_config import get_logger
 
+try:
+    # Optional: faster JSON serialization straight to bytes
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = get_logger("MALDI.Optimizer")
 
+# Per-process (bed, scheduler) for process-pool stride sweeps, set by _init_stride_process
+_process_ctx = None
+
+
+def _build_stride_context(size_mm: float, grid_step_mm: float, spray_mask, rect: List[float],
+                          samples_from: Optional[BedMesh] = None):
+    """Create an isolated BedMesh + Scheduler carrying the sweep's sample mask and nozzle kernel.
+    With `samples_from`, the mask arrays and labels of that bed are shared instead of rebuilt.
+    """
+    bm = BedMesh(size_mm=size_mm, grid_step_mm=grid_step_mm, spray_mask=spray_mask)
+    if samples_from is not None:
+        bm.share_samples(samples_from)
+    else:
+        bm.add_bool_mask(points=rect, shape="rectangle")
+    return bm, Scheduler(bed=bm, mov_list=[])
+
+
+def _run_stride(bm: BedMesh, sim: Scheduler, s_val: float, serp_kwargs: dict):
+    """Simulate one serpentine stride on a reusable bed and return its per-region std devs."""
+    bm.clear_deposition_mesh()
+    serp = SquaredSerpentine(bm=bm, bool_mask=bm._bool_masks[0], stride=s_val, **serp_kwargs)
+    sim.reset_with_movements(serp.movements_arr)
+    # Many strides run at once from pool workers: no per-sim progress bar
+    sim.start(live_plot=False, show_progress=False)
+    dev_std = bm.get_std_deviation(overall_dev=False)
+    logger.debug(f"Stride {s_val:.3f}mm - std_dev: {np.mean(dev_std) if isinstance(dev_std, (list, np.ndarray)) else dev_std:.4f}")
+    return dev_std
+
+
+def _init_stride_process(size_mm: float, grid_step_mm: float, spray_mask, rect: List[float]) -> None:
+    """ProcessPoolExecutor initializer: build this worker process's bed once."""
+    global _process_ctx
+    _process_ctx = _build_stride_context(size_mm, grid_step_mm, spray_mask, rect)
+
+
+def _eval_stride_in_process(index: int, s_val: float, serp_kwargs: dict):
+    """Process-pool worker: run one stride on the bed built by _init_stride_process."""
+    bm, sim = _process_ctx
+    return index, s_val, _run_stride(bm, sim, s_val, serp_kwargs)
+
 
 class Optimizer:
     def __init__(self, bed_mesh: BedMesh, serpentine: SquaredSerpentine, verbose: bool = True):
         self.bed_mesh = bed_mesh
         self.serpentine = serpentine
-        self.dev_vs_stride = []  # List to store standard deviation vs stride values
+        self.dev_vs_stride = []  # (stride, devs) record array, filled by span_std_vs_stride
         self.verbose = verbose
         # Keep a single-mask list for downstream JSON compatibility
         self.bool_masks = [self.serpentine.mask]
@@ -22,8 +68,7 @@ class Optimizer:
 
     def _sim_routine(self, speed: float = 5, progress_callback: Optional[Callable[[int, int], None]] = None):
         # Build scheduler from the single serpentine movements
-        movements = list(self.serpentine.movements)
-        sim = Scheduler(bed=self.bed_mesh, mov_list=movements)
+        sim = Scheduler(bed=self.bed_mesh, mov_list=self.serpentine.movements_arr)
         sim.start(live_plot=self.verbose, refresh_every=1, progress_callback=progress_callback)
 
     def span_std_vs_stride(
@@ -35,7 +80,9 @@ class Optimizer:
         ax=None,
         save_to_json: bool = False,
         return_figs: bool = False,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        pretty_json: bool = False,
+        processes: bool = False,
     ):
         """
         Sweep the serpentine stride, simulate, and collect deposition std-dev for each stride.
@@ -43,13 +90,18 @@ class Optimizer:
         Args:
             progress_callback: Optional callback function that receives (current_step, total_steps)
                              for progress updates.
+            pretty_json: Indent the saved JSON (compact by default).
+            processes: Evaluate strides in worker processes instead of threads. Worth it for long
+                sweeps without numba, where the NumPy stamping holds the GIL part of the time;
+                threads are cheaper to start and already run in parallel in the compiled stamp.
 
         Returns:
             (strides_array, dev_std_array, best_stride[, figs])
         """
         import matplotlib.pyplot as plt
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
         import os
+        import threading
 
         # Build stride sweep starting from current stride of the single serpentine
         speed = self.serpentine.speed
@@ -57,7 +109,7 @@ class Optimizer:
         if strides is None:
             lower = max(float(self.bed_mesh.grid_step_mm), current / 5.0, 0.05)
             strides = np.linspace(current, lower, num=10, retstep=False)
-        strides_arr = np.asarray(list(strides), dtype=float)
+        strides_arr = np.asarray(strides, dtype=float)
         
         logger.info(f"Starting stride optimization sweep with {len(strides_arr)} strides")
         logger.info(f"Stride range: {strides_arr.min():.3f}mm - {strides_arr.max():.3f}mm")
@@ -67,59 +119,72 @@ class Optimizer:
         blc = getattr(mask0, 'bl_corner', (0.0, 0.0))
         xs = float(getattr(mask0, 'x_size', 0.0))
         ys = float(getattr(mask0, 'y_size', 0.0))
+        rect = [float(blc[0]), float(blc[0]) + xs, float(blc[1]), float(blc[1]) + ys]
+
+        # The nozzle kernel depends on Z and the spray function only, not on stride:
+        # build it once and share it with every worker bed
+        spray_mask = self.bed_mesh._nozzle.spray_mask
+        bed_args = (self.bed_mesh.size_mm, self.bed_mesh.grid_step_mm, spray_mask, rect)
+        serp_kwargs = dict(
+            margin=self.serpentine.margin,
+            x_amnt=self.serpentine.x_amnt,
+            speed=self.serpentine.speed,
+            max_speed=self.serpentine.max_speed,
+            passes=self.serpentine.passes,
+            alternate_offset=self.serpentine.alternate_offset,
+        )
 
-        # Worker: run a full sim for a given stride on an isolated BedMesh
+        # One isolated BedMesh + Scheduler per worker thread, built on first use and reset in
+        # place between strides: bed allocation, sample mask and kernel do not depend on stride.
+        # Threads share one read-only copy of the sample mask and its labels; only the
+        # deposition mesh is per worker.
+        worker_state = threading.local()
+        samples_bed = None if processes else _build_stride_context(*bed_args)[0]
+
+        # Worker: run a full sim for a given stride on the thread's BedMesh
         def _eval_stride(index: int, s_val: float):
-            bm = BedMesh(
-                size_mm=self.bed_mesh.size_mm,
-                grid_step_mm=self.bed_mesh.grid_step_mm,
-                spray_function=self.bed_mesh.spray_function,
-            )
-            # Recreate the boolean mask on this bed
-            bm.add_bool_mask(points=[float(blc[0]), float(blc[0]) + xs, float(blc[1]), float(blc[1]) + ys], shape="rectangle")
-            serp = SquaredSerpentine(
-                bm=bm,
-                bool_mask=bm._bool_masks[0],
-                margin=self.serpentine.margin,
-                x_amnt=self.serpentine.x_amnt,
-                stride=float(s_val),
-                speed=self.serpentine.speed,
-                max_speed=self.serpentine.max_speed,
-                passes=self.serpentine.passes,
-                alternate_offset=self.serpentine.alternate_offset,
-            )
-            sim = Scheduler(bed=bm, mov_list=list(serp.movements))
-            sim.start(live_plot=False)
-            dev_std = bm.get_std_deviation(overall_dev=False)
-            logger.debug(f"Stride {s_val:.3f}mm - std_dev: {np.mean(dev_std) if isinstance(dev_std, (list, np.ndarray)) else dev_std:.4f}")
-            return index, float(s_val), dev_std
-
-        # Launch all in a thread pool
+            ctx = getattr(worker_state, "ctx", None)
+            if ctx is None:
+                ctx = worker_state.ctx = _build_stride_context(*bed_args, samples_from=samples_bed)
+            return index, s_val, _run_stride(*ctx, s_val, serp_kwargs)
+
+        # Launch all in a worker pool
         total_strides = len(strides_arr)
-        max_workers = min(32, (os.cpu_count() or 1) * 2)
+        # CPU-bound workers: more threads than cores (or strides) only adds contention and beds
+        max_workers = max(1, min(total_strides, os.cpu_count() or 1, 32))
         futures = []
-        results_by_index: dict[int, tuple[float, List[float]]] = {}
+        # (strides, regions) std devs, written in place as each stride completes
+        devs_arr: Optional[np.ndarray] = None
         logger.info(f"Launching {total_strides} stride evaluations with {max_workers} workers")
-        with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        if processes:
+            # Each process builds its bed once; the shared kernel is pickled, not rebuilt
+            pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_stride_process, initargs=bed_args)
+        else:
+            pool = ThreadPoolExecutor(max_workers=max_workers)
+        with pool as ex:
             for idx, s in enumerate(strides_arr):
-                futures.append(ex.submit(_eval_stride, idx, float(s)))
+                if processes:
+                    futures.append(ex.submit(_eval_stride_in_process, idx, float(s), serp_kwargs))
+                else:
+                    futures.append(ex.submit(_eval_stride, idx, float(s)))
             completed = 0
             for fut in as_completed(futures):
                 idx, s_val, dev_std = fut.result()
-                results_by_index[idx] = (s_val, dev_std)
+                if devs_arr is None:
+                    # Every worker bed carries the same sample mask, so the region count is fixed
+                    devs_arr = np.empty((total_strides, len(dev_std)), dtype=np.float64)
+                devs_arr[idx] = dev_std
                 completed += 1
                 if progress_callback:
                     progress_callback(completed, total_strides)
                 logger.info(f"Stride evaluation progress: {completed}/{total_strides}")
 
-        # Order results according to input strides
-        ordered = [results_by_index[i] for i in range(total_strides)]
-        strides_arr = np.asarray([s for (s, _) in ordered], dtype=float)
-        devs = [dev for (_, dev) in ordered]
-        devs_arr = np.asarray(devs, dtype=float)
+        assert devs_arr is not None
 
-        # Store results
-        self.dev_vs_stride = list(zip(map(float, strides_arr), devs))
+        # Store results as a record array (rows are already in input stride order)
+        self.dev_vs_stride = np.rec.fromarrays(
+            [strides_arr, devs_arr], dtype=[("stride", np.float64), ("devs", np.float64, (devs_arr.shape[1],))]
+        )
 
         # Determine best stride (use mean across components if multiple connected regions are found)
         if devs_arr.ndim == 2:
@@ -176,22 +241,29 @@ class Optimizer:
                             "shape": [int(sa.get("x_size", 0)), int(sa.get("y_size", 0))]
                         }
                     return {"size": 0.0, "position": [0.0, 0.0], "shape": [0, 0]}
-                with open(f"logs/dev_vs_stride_{timestamp.replace(':', '-')}.json", "w") as f:
-                    json.dump({
-                        "dev_vs_stride": [(float(s), [float(d) for d in dev]) for s, dev in self.dev_vs_stride],
-                        "best_strides": float(best_stride),
-                        "best_devs": float(best_dev),
-                        "bool_masks": [_mask_info(self.bool_masks[0])]
-                    }, f, indent=4)
-                logger.info(f"Results saved to logs/dev_vs_stride_{timestamp.replace(':', '-')}.json")
+                json_path = f"logs/dev_vs_stride_{timestamp.replace(':', '-')}.json"
+                payload = {
+                    "dev_vs_stride": list(zip(strides_arr.tolist(), devs_arr.tolist())),
+                    "best_strides": float(best_stride),
+                    "best_devs": float(best_dev),
+                    "bool_masks": [_mask_info(self.bool_masks[0])]
+                }
+                # logs/ only appears once the logger writes a record; don't rely on that
+                os.makedirs(os.path.dirname(json_path), exist_ok=True)
+                if orjson is not None:
+                    with open(json_path, "wb") as f:
+                        f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2 if pretty_json else 0))
+                else:
+                    with open(json_path, "w") as f:
+                        json.dump(payload, f, indent=4 if pretty_json else None)
+                logger.info(f"Results saved to {json_path}")
         if return_figs:
             return strides_arr, devs_arr, best_stride, figs
         return strides_arr, devs_arr, best_stride
 
     def bedmesh_plot(self, ax):
         # Helper to plot bedmesh layers consistently
-        self.bed_mesh.plot(keyword="deposition", ax=ax)
-        self.bed_mesh.plot(keyword="boxes", ax=ax)
+        self.bed_mesh.plot_combined(ax=ax)
 
     def plot_status(self):
         """Plot the current status of the bed mesh and serpentine, overlapping all elements."""
@@ -1,6 +1,6 @@
 # This optimizer aims to create a cornered serpentine on each sample area
 from meshing import BedMesh, Mask
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 from numpy import array as Array
 from numpy import ndarray as NDArray
 from numpy.typing import ArrayLike
@@ -19,7 +19,9 @@ class SquaredSerpentine:
         self.margin: float = margin
         self.x_amnt = x_amnt
         self.stride = stride
-        self.movements: List[Movement] = []
+        # One (x, y, speed, acceleration) row per movement; Movement objects are built on demand
+        self.movements_arr: NDArray = np.empty((0, 4))
+        self._movements: Optional[List[Movement]] = None
         self.passes = passes
         self.speed = speed
         self.max_speed = max_speed
@@ -28,6 +30,18 @@ class SquaredSerpentine:
     def get_stride(self) -> float:
         """Get the current stride value."""
         return self.stride
+    @property
+    def movements(self) -> List[Movement]:
+        """The movements as a list of Movement objects, built from `movements_arr` on first access."""
+        if self._movements is None:
+            self._movements = [Movement(*row) for row in self.movements_arr.tolist()]
+        return self._movements
+
+    def as_arrays(self) -> Tuple[NDArray, NDArray, NDArray]:
+        """Return the movements as (x, y, speed) float arrays."""
+        arr = self.movements_arr
+        return arr[:, 0], arr[:, 1], arr[:, 2]
+
     def set_stride(self, stride: float) -> None:
         """Set a new stride and recompute serpentines."""
         self.stride = stride
@@ -49,7 +63,8 @@ class SquaredSerpentine:
         The serpentine movement zone is the mask bounding box expanded by `margin` in all directions,
         then clamped to the overall bed extents [0, size_mm].
         """
-        self.movements = []
+        self.movements_arr = np.empty((0, 4))
+        self._movements = None
         # Retrieve mask bbox from SampleMask attributes if available
         bl_corner = getattr(self.mask, 'bl_corner', None)
         x_size_attr = getattr(self.mask, 'x_size', None)
@@ -106,50 +121,31 @@ class SquaredSerpentine:
         y_final: NDArray = np.repeat(y_source, x_source.shape[0])
 
         # Populate x (serpentine: alternate direction each row)
-        x_final: NDArray = np.array([], dtype=float)
-        for count in range(0, len(y_source)):
-            if (count % 2 == 0):
-                x_final = np.concatenate((x_final, x_source))
-            else:
-                x_final = np.concatenate((x_final, np.flip(x_source)))
-
-        # Assemble, ensure equal length
-        length: int = min(x_final.shape[0], y_final.shape[0])
-        x_final = x_final[0:length]
-        y_final = y_final[0:length]
-        points = np.vstack((x_final, y_final))
-        # Generate Movement list
-        cur_movements: List[Movement] = []
-        n = points.shape[1]
-        for pass_num in range(self.passes):
-            # If even pass, follow normal order, else reverse order
-            is_even_pass: bool = (pass_num % 2 == 0)
-            if is_even_pass:
-                order = range(n)
-            else:
-                order = range(n - 1, -1, -1)
-            y_ofs = 0.0
-            for i in order:
-                if not is_even_pass and self.alternate_offset:
-                    y_ofs = self.stride / 2.0
-                x = float(points[0, i])
-                y = float(points[1, i]) + y_ofs
-                mv = Movement(x, y, speed=self.speed)
-                cur_movements.append(mv)
-
-        self.movements = cur_movements
+        tile: NDArray = np.tile(x_source, (y_source.shape[0], 1))
+        tile[1::2] = x_source[::-1]
+        x_final: NDArray = tile.ravel()
+
+        # Generate movement rows, filled in place per pass: odd passes run the path backwards,
+        # optionally offset by half a stride
+        n = x_final.shape[0]
+        arr = np.zeros((self.passes * n, 4))
+        passes = arr.reshape(self.passes, n, 4)
+        passes[0::2, :, 0] = x_final
+        passes[0::2, :, 1] = y_final
+        passes[1::2, :, 0] = x_final[::-1]
+        passes[1::2, :, 1] = y_final[::-1] + (self.stride / 2.0 if self.alternate_offset else 0.0)
+        arr[:, 2] = self.speed
+        self.movements_arr = arr
 
     def draw(self, ax=None):
         """Draw the serpentine paths on the provided axis or create a new one."""
         created_ax = False
         if ax is None:
-            import matplotlib
-            matplotlib.use('Agg')
+            # Keep the active backend: forcing Agg here would turn the plt.show() below into a no-op
             import matplotlib.pyplot as plt
             fig, ax = plt.subplots()
             created_ax = True
-        x = [movement.x for movement in self.movements]
-        y = [movement.y for movement in self.movements]
+        x, y, _ = self.as_arrays()
         ax.quiver(x[:-1], y[:-1], np.diff(x), np.diff(y), angles='xy', scale_units='xy', scale=1)
         ax.set_xlim(0, self.bm.size_mm)
         ax.set_ylim(0, self.bm.size_mm)
@@ -1,7 +1,8 @@
 from dataclasses import dataclass
+import math
 from numpy import ndarray as NDArray
 import numpy as np
-from typing import Optional, Tuple, List, Callable
+from typing import Optional, Tuple, List, Callable, Union
 from meshing import BedMesh
 from tqdm import tqdm
 
@@ -22,6 +23,25 @@ class Movement:
         self.acceleration = float(self.acceleration)
 
 
+def movements_to_array(mov_list: Union[List[Movement], NDArray]) -> NDArray:
+    """Return movements as an (N, 4) float array of (x, y, speed, acceleration) rows.
+
+    Arrays with fewer columns (e.g. (x, y, speed)) are zero-padded; Movement lists are converted.
+    """
+    if isinstance(mov_list, np.ndarray):
+        arr = np.asarray(mov_list, dtype=float)
+        if arr.ndim != 2 or not 2 <= arr.shape[1] <= 4:
+            raise ValueError(f"Movement array must have shape (N, 2..4), got {arr.shape}")
+        if arr.shape[1] < 4:
+            arr = np.pad(arr, ((0, 0), (0, 4 - arr.shape[1])))
+        return arr
+    n = len(mov_list)
+    arr = np.empty((n, 4))
+    for i, m in enumerate(mov_list):
+        arr[i] = (m.x, m.y, m.speed, m.acceleration)
+    return arr
+
+
 class Scheduler:
     """
     Scheduler simulates the movement of a nozzle over a bed mesh, controlling the deposition process
@@ -30,32 +50,53 @@ class Scheduler:
     Attributes:
         bed (BedMesh): The mesh representing the bed where deposition occurs.
         current_position (Tuple[float, float]): The current (x, y) position of the nozzle.
-        movement_list (List[Movement]): List of movements to execute, each with target position and speed.
+        movement_list (List[Movement] | NDArray): Movements to execute, as given by the caller.
+        movement_arr (NDArray): The same movements as (N, 4) rows of (x, y, speed, acceleration).
         current_speed (float): The current speed of the nozzle.
         current_time (float): The current simulation time.
         min_time_step (float): The minimum allowed time step for simulation.
     """
 
-    def __init__(self, bed: BedMesh, mov_list: List[Movement], min_time_step: float = 0.1):
+    # Sub-steps accumulated before they are sprayed in one Nozzle.spray_batch call
+    _SPRAY_BATCH_SIZE = 4096
+
+    def __init__(self, bed: BedMesh, mov_list: Union[List[Movement], NDArray], min_time_step: float = 0.1):
         """
         Initialize the Scheduler.
 
         Args:
             bed (BedMesh): The mesh representing the bed for deposition.
-            x_y_speed (NDArray): Array of movements, each containing (x, y, speed).
+            mov_list (List[Movement] | NDArray): Movements to execute, either Movement objects or an
+                (N, 3) / (N, 4) array of (x, y, speed[, acceleration]) rows.
             min_time_step (float, optional): Minimum allowed time step for simulation. Defaults to 0.1.
         """
         self.bed = bed
         self.current_position: Tuple[float, float] = (0.0, 0.0)
-        self.movement_list: List[Movement] = []
         self.current_speed: float = 0
         self.movement_list = mov_list
+        self.movement_arr: NDArray = movements_to_array(mov_list)
         self.current_time: float = 0.0
         self.min_time_step: float = min_time_step
         # Track segments for live plotting: list of ((x0,y0), (x1,y1))
         self._segments: List[Tuple[Tuple[float, float], Tuple[float, float]]] = []
 
-    def start(self, live_plot: bool = False, refresh_every: int = 1, progress_callback: Optional[Callable[[int, int], None]] = None):
+    def reset_with_movements(self, mov_list: Union[List[Movement], NDArray]) -> None:
+        """
+        Reuse this scheduler (and its bed) for a new path: swap the movements and rewind
+        position, time and plotted segments. The bed deposition is left to the caller.
+
+        Args:
+            mov_list (List[Movement] | NDArray): The movements to execute on the next start().
+        """
+        self.movement_list = mov_list
+        self.movement_arr = movements_to_array(mov_list)
+        self.current_position = (0.0, 0.0)
+        self.current_speed = 0
+        self.current_time = 0.0
+        self._segments = []
+
+    def start(self, live_plot: bool = False, refresh_every: int = 1, progress_callback: Optional[Callable[[int, int], None]] = None,
+              show_progress: bool = True):
         """
         Execute the scheduled movements, simulating nozzle deposition over the bed mesh.
 
@@ -68,18 +109,39 @@ class Scheduler:
             refresh_every (int): Redraw frequency in number of high-level movements. Defaults to 1.
             progress_callback (Optional[Callable[[int, int], None]]): Optional callback function
                 that receives (current_step, total_steps) for progress updates. Defaults to None.
+            show_progress (bool): Show a tqdm bar when no progress_callback is given. Defaults to True.
         """
         fig = ax = None
-        total_moves = len(self.movement_list)
+        total_moves = self.movement_arr.shape[0]
         if live_plot:
             # reset segments for a fresh session
             self._segments = []
             fig, ax = self._init_live_plot()
 
+        # Plain float lists: per-move scalar reads are cheaper than indexing the array
+        xs = self.movement_arr[:, 0].tolist()
+        ys = self.movement_arr[:, 1].tolist()
+        speeds = self.movement_arr[:, 2].tolist()
+        step = float(self.bed.grid_step_mm)
+        # Loop invariants bound once; position and time are still written back per movement
+        spray_batch = self.bed._nozzle.spray_batch
+        min_time_step = self.min_time_step
+        batch_size = self._SPRAY_BATCH_SIZE
+        refresh_every = max(1, refresh_every)
+        last_idx = total_moves - 1
+        # Per-movement sub-step paths (x, y, time columns) and dwell times queued across
+        # movements; they are stacked and sprayed in large batches
+        pending: List[Tuple[NDArray, float]] = []
+        pending_n = 0
+
         # Use tqdm only if no progress_callback is provided
-        iterator = self.movement_list if progress_callback else tqdm(self.movement_list, desc="Simulating movements", unit="move")
+        moves = range(total_moves)
+        if progress_callback or not show_progress:
+            iterator = moves
+        else:
+            iterator = tqdm(moves, desc="Simulating movements", unit="move")
         
-        for idx, movement in enumerate(iterator):
+        for idx in iterator:
             # Call progress callback if provided
             if progress_callback:
                 progress_callback(idx + 1, total_moves)
@@ -87,21 +149,21 @@ class Scheduler:
             # Starting point of this high-level movement (for plotting)
             start_of_move = self.current_position
 
-            x_target = float(movement.x)
-            y_target = float(movement.y)
-            speed = float(movement.speed)
-            step = float(self.bed.grid_step_mm)
+            x_target = xs[idx]
+            y_target = ys[idx]
+            speed = speeds[idx]
 
             dx_total = x_target - start_of_move[0]
             dy_total = y_target - start_of_move[1]
-            distance = float(np.hypot(dx_total, dy_total))
+            # Scalar math: NumPy dispatch costs more than the arithmetic for single floats
+            distance = math.hypot(dx_total, dy_total)
             time_duration = (distance / speed) if speed > 0 else 0.0
 
             # Determine steps by space and by time, then take the max
-            n_by_space = int(np.ceil(distance / step)) if step > 0 else 1
+            n_by_space = math.ceil(distance / step) if step > 0 else 1
             n_by_space = max(1, n_by_space)
-            if self.min_time_step > 0 and time_duration > 0:
-                n_by_time = int(np.ceil(time_duration / self.min_time_step))
+            if min_time_step > 0 and time_duration > 0:
+                n_by_time = math.ceil(time_duration / min_time_step)
             else:
                 n_by_time = 1
             n_steps = max(1, n_by_space, n_by_time)
@@ -111,26 +173,56 @@ class Scheduler:
             inc_x = dx_total / n_steps if n_steps > 0 else 0.0
             inc_y = dy_total / n_steps if n_steps > 0 else 0.0
 
-            # March along the segment depositing at each sub-step
-            for _ in range(n_steps):
-                self.current_position = (
-                    self.current_position[0] + inc_x,
-                    self.current_position[1] + inc_y,
-                )
-                # Use dt to scale deposition proportionally to dwell time
-                self.bed._nozzle.spray(apply_position=self.current_position, time=dt)
-                self.current_time += dt
+            # March along the segment depositing at each sub-step, dt scaling the deposition.
+            # cumsum adds the increments one after another, so sub-step positions, the end
+            # position (and with it the next movement's sub-step count) and time match the
+            # original stepping loop bit for bit
+            path = np.full((n_steps + 1, 3), (inc_x, inc_y, dt))
+            path[0] = (start_of_move[0], start_of_move[1], self.current_time)
+            np.cumsum(path, axis=0, out=path)
+            pending.append((path[1:], dt))
+            pending_n += n_steps
+            end_x, end_y, self.current_time = path[-1].tolist()
+            self.current_position = (end_x, end_y)
+
+            refresh = live_plot and ((idx % refresh_every == 0) or (idx == last_idx))
+            # The live plot must show everything sprayed so far
+            if pending_n >= batch_size or refresh or idx == last_idx:
+                spray_batch(*self._expand_substeps(pending))
+                pending, pending_n = [], 0
 
             # After completing this high-level movement, record the segment and refresh if needed
             if live_plot:
                 self._segments.append((start_of_move, (self.current_position[0], self.current_position[1])))
-                if (idx % max(1, refresh_every) == 0) or (idx == total_moves - 1):
+                self._record_arrow(idx, start_of_move, self.current_position)
+                if refresh:
                     self._refresh_live_plot(ax)
 
         # Ensure final plot is up-to-date
         if live_plot:
             self._refresh_live_plot(ax)
 
+    @staticmethod
+    def _expand_substeps(segments: List[Tuple[NDArray, float]]) -> Tuple[NDArray, NDArray]:
+        """
+        Stack queued per-movement sub-step paths into one batch.
+
+        Each segment is an (n, 3) path of running-sum (x, y, time) sub-steps and its dwell time.
+
+        Returns:
+            Tuple[NDArray, NDArray]: (N, 2) positions and (N,) dwell times.
+        """
+        paths, dts = zip(*segments)
+        pos = np.concatenate(paths)[:, :2]
+        return pos, np.repeat(dts, [p.shape[0] for p in paths])
+
+    def _record_arrow(self, idx: int, start: Tuple[float, float], end: Tuple[float, float]) -> None:
+        """Store movement `idx` as a live-plot arrow; zero-length movements stay hidden."""
+        dx = end[0] - start[0]
+        dy = end[1] - start[1]
+        if dx != 0 or dy != 0:
+            self._arrows[idx] = (start[0], start[1], dx, dy)
+
     def _ensure_interactive_backend(self):
         """Attempt to switch to an interactive matplotlib backend if a non-interactive one is active."""
         import matplotlib
@@ -148,7 +240,6 @@ class Scheduler:
         self._ensure_interactive_backend()
         import matplotlib.pyplot as plt
         from matplotlib.patches import Rectangle
-        from scipy.ndimage import label as ndimage_label, find_objects
         plt.ion()
         fig, ax = plt.subplots()
 
@@ -161,12 +252,10 @@ class Scheduler:
         cb = fig.colorbar(im, ax=ax, label='Intensity')
 
         # Static boolean mask bounding boxes (computed once)
-        bool_mesh = np.asarray(self.bed.bool_mesh, dtype=bool)
-        result = ndimage_label(bool_mesh)
-        labeled = result[0] if isinstance(result, tuple) else result
+        _, slices = self.bed._get_labels()
         step = self.bed.grid_step_mm
         self._box_patches = []
-        for sl in find_objects(labeled):
+        for sl in slices:
             if sl is None:
                 continue
             y_slice, x_slice = sl
@@ -181,9 +270,12 @@ class Scheduler:
             ax.add_patch(rect)
             self._box_patches.append(rect)
 
-        # Quiver for path arrows (start empty, updated later)
-        self._qv = ax.quiver([], [], [], [], angles='xy', scale_units='xy', scale=1, color='cyan', alpha=0.9)
-        self._qv_count = 0
+        # Quiver with one arrow slot per movement, created once: rows are (x0, y0, dx, dy) and
+        # NaN rows (not yet executed or zero-length) are masked out when drawing
+        n_moves = self.movement_arr.shape[0]
+        self._arrows = np.full((n_moves, 4), np.nan)
+        self._qv = ax.quiver(self._arrows[:, 0], self._arrows[:, 1], self._arrows[:, 2], self._arrows[:, 3],
+                             angles='xy', scale_units='xy', scale=1, color='cyan', alpha=0.9)
 
         # Current position marker
         (pos_pt,) = ax.plot([self.current_position[0]], [self.current_position[1]],
@@ -222,44 +314,9 @@ class Scheduler:
         # Update deposition image
         if hasattr(self, '_im') and self._im is not None:
             self._im.set_data(self.bed.deposition_mesh)
-        # Update path arrows using quiver (filter zero-length segments)
-        xs, ys, us, vs = [], [], [], []
-        for (x0, y0), (x1, y1) in self._segments:
-            dx = x1 - x0
-            dy = y1 - y0
-            if dx == 0 and dy == 0:
-                continue
-            xs.append(x0)
-            ys.append(y0)
-            us.append(dx)
-            vs.append(dy)
-        n = len(xs)
-        if n == 0:
-            # Ensure we don't keep stale arrows; recreate empty quiver if needed
-            try:
-                if self._qv is not None:
-                    self._qv.remove()
-            except Exception:
-                pass
-            self._qv = ax.quiver([], [], [], [], angles='xy', scale_units='xy', scale=1, color='cyan', alpha=0.9)
-            self._qv_count = 0
-        else:
-            X0Y0 = np.column_stack([xs, ys])
-            U = np.asarray(us)
-            V = np.asarray(vs)
-            if not hasattr(self, '_qv_count') or self._qv_count != n or self._qv is None:
-                # Recreate quiver when arrow count changes to avoid matplotlib size mismatch
-                try:
-                    if self._qv is not None:
-                        self._qv.remove()
-                except Exception:
-                    pass
-                self._qv = ax.quiver(X0Y0[:, 0], X0Y0[:, 1], U, V, angles='xy',
-                                     scale_units='xy', scale=1, color='cyan', alpha=0.9)
-                self._qv_count = n
-            else:
-                self._qv.set_offsets(X0Y0)
-                self._qv.set_UVC(U, V)
+        # Update path arrows in place; the arrow count never changes
+        self._qv.set_offsets(self._arrows[:, :2])
+        self._qv.set_UVC(self._arrows[:, 2], self._arrows[:, 3])
         # Update current position marker
         if hasattr(self, '_pos_pt') and self._pos_pt is not None:
             self._pos_pt.set_data([self.current_position[0]], [self.current_position[1]])
@@ -1 +1 @@
-from .Simulator import Scheduler, Movement
+from .Simulator import Scheduler, Movement, movements_to_array
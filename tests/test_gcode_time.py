@@ -0,0 +1,28 @@
+import pytest
+
+import wrapper  # noqa: F401  (imported first: meshing <-> wrapper import cycle)
+from gcode import GCodeCreator
+
+
+@pytest.fixture
+def creator():
+    return GCodeCreator([])
+
+
+@pytest.mark.parametrize(
+    "gcode, movement, heating",
+    [
+        # Every capture one character wide
+        ("G1 X5 F0", 0.0, 0.0),
+        ("G1", 0.0, 0.0),
+        ("G1 X0\nM190 S60", 0.0, 180.0),
+        ("G1 X3 Y4 F6", 50.0, 0.0),
+        # Feed carries over; missing axes keep the previous position
+        ("G1 X1\nG1 Y1 F1\nG1 X0", 1.0 / 3000.0 * 60.0 + 120.0, 0.0),
+    ],
+)
+def test_estimate_print_time_short_moves(creator, gcode, movement, heating):
+    est = creator.estimate_print_time(gcode)
+    assert est["movement_seconds"] == pytest.approx(movement)
+    assert est["heating_seconds"] == pytest.approx(heating)
+    assert est["total_seconds"] == pytest.approx(movement + heating)
@@ -0,0 +1,45 @@
+import math
+
+import numpy as np
+
+import wrapper  # noqa: F401  (imported first: meshing <-> wrapper import cycle)
+from meshing import BedMesh, SprayMask
+from simulation import Movement, Scheduler
+
+STEP = 0.4
+
+
+def _stepping_loop(moves, step, min_time_step):
+    """Original Scheduler.start: advance one sub-step at a time, recording each position."""
+    x, y, t = 0.0, 0.0, 0.0
+    positions = []
+    for m in moves:
+        dx, dy = m.x - x, m.y - y
+        distance = float(np.hypot(dx, dy))
+        duration = distance / m.speed if m.speed > 0 else 0.0
+        n = max(1, math.ceil(distance / step))
+        if min_time_step > 0 and duration > 0:
+            n = max(n, math.ceil(duration / min_time_step))
+        for _ in range(n):
+            x, y, t = x + dx / n, y + dy / n, t + duration / n
+            positions.append((x, y, duration / n))
+    return np.array(positions), (x, y), t
+
+
+def test_substeps_match_stepping_loop(monkeypatch):
+    mask = SprayMask(size_mm=1.2, grid_step_mm=STEP, function=lambda mesh: np.ones_like(mesh[0]),
+                     bottom_limit=-0.6, upper_limit=0.6)
+    bed = BedMesh(60.0, STEP, spray_mask=mask)
+    # Serpentine-like legs whose running-sum end points land a few ulp off grid multiples
+    moves = [Movement(x, y, speed=10.0) for x, y in
+             ((17.0, 31.0), (33.0, 31.0), (33.0, 29.0), (17.0, 29.0), (17.0, 27.1), (33.3, 27.1), (0.1, 0.7))]
+    sprayed = []
+    monkeypatch.setattr(bed._nozzle, "spray_batch", lambda pos, dt: sprayed.append(np.column_stack((pos, dt))))
+
+    sim = Scheduler(bed=bed, mov_list=moves)
+    sim.start(progress_callback=lambda *a: None)
+
+    expected, end, end_time = _stepping_loop(moves, STEP, sim.min_time_step)
+    np.testing.assert_array_equal(np.concatenate(sprayed), expected)
+    assert sim.current_position == end
+    assert sim.current_time == end_time
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+from scipy import ndimage
+
+import wrapper  # noqa: F401  (imported first: meshing <-> wrapper import cycle)
+from meshing import BedMesh, SprayMask
+
+STEP = 0.2
+BED_MM = 20.0
+
+
+def _gaussian(mesh):
+    x, y = mesh
+    return np.exp(-(x ** 2 + y ** 2) / (2 * 0.6 ** 2))
+
+
+@pytest.fixture
+def mask():
+    return SprayMask(size_mm=3.0, grid_step_mm=STEP, function=_gaussian, bottom_limit=-1.5, upper_limit=1.5)
+
+
+def _bed(mask):
+    return BedMesh(BED_MM, STEP, spray_mask=mask)
+
+
+def _positions():
+    rng = np.random.default_rng(0)
+    # Dense streak (FFT territory), scattered and edge-clipped stamps, whole-cell positions
+    streak = np.stack((np.linspace(2.0, 18.0, 400), np.full(400, 10.037)), axis=1)
+    scattered = rng.uniform(-1.0, BED_MM + 1.0, (60, 2))
+    whole = np.round(rng.uniform(0.0, BED_MM, (20, 2)) / STEP) * STEP
+    pos = np.vstack((streak, scattered, whole))
+    times = rng.uniform(0.0, 0.1, pos.shape[0])
+    return pos, times
+
+
+def _direct(mask, pos, times):
+    bed = _bed(mask)
+    for p, t in zip(pos, times):
+        mask.apply(bed, p, (0.0, 0.0), t)
+    return bed.deposition_mesh.copy()
+
+
+def test_apply_matches_constant_mode_shift(mask):
+    """Each stamp equals the kernel shifted by ndimage in constant mode, clipped to its window."""
+    pos, times = _positions()
+    expected = np.zeros_like(_bed(mask).deposition_mesh)
+    r = mask._radius_cells
+    H, W = expected.shape
+    for (x, y), t in zip(pos, times):
+        ux, uy = x / STEP, y / STEP
+        jx, jy = int(np.floor(ux)), int(np.floor(uy))
+        tile = ndimage.shift(mask.mask, (uy - jy, ux - jx), order=1, mode="constant", prefilter=False)
+        if t > 0:
+            tile = tile * t
+        y0, y1 = max(0, jy - r), min(H, jy + r + 1)
+        x0, x1 = max(0, jx - r), min(W, jx + r + 1)
+        if y1 > y0 and x1 > x0:
+            expected[y0:y1, x0:x1] += tile[y0 - jy + r:y1 - jy + r, x0 - jx + r:x1 - jx + r]
+    np.testing.assert_allclose(_direct(mask, pos, times), expected, rtol=0, atol=1e-6 * expected.max())
+
+
+def test_fft_matches_direct_stamping(mask):
+    pos, times = _positions()
+    direct = _direct(mask, pos, times)
+    bed = _bed(mask)
+    mask.apply_path(bed, pos, times)
+    fft = bed.deposition_mesh
+    np.testing.assert_allclose(fft, direct, rtol=0, atol=1e-5 * direct.max())
+    # Cells no stamp reaches stay exactly zero, and nothing goes negative
+    assert np.count_nonzero(fft[direct == 0]) == 0
+    assert fft.min() >= 0
+
+
+def test_fft_route_of_apply_batch(mask):
+    pos, times = _positions()
+    streak, streak_times = pos[:400], times[:400]
+    bed = _bed(mask)
+    H, W = bed.deposition_mesh.shape
+    jy = np.floor(streak[:, 1] / STEP).astype(np.intp)
+    jx = np.floor(streak[:, 0] / STEP).astype(np.intp)
+    assert mask._fft_is_cheaper(jy, jx, H, W)
+    mask.apply_batch(bed, streak, streak_times)
+    direct = _direct(mask, streak, streak_times)
+    np.testing.assert_allclose(bed.deposition_mesh, direct, rtol=0, atol=1e-5 * direct.max())
+    assert np.count_nonzero(bed.deposition_mesh[direct == 0]) == 0
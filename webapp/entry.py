@@ -1,5 +1,14 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 
+# Make the project packages importable for every page; Streamlit re-executes this script
+# on each rerun, so insert the root only once
+_project_root = str(Path(__file__).resolve().parent.parent)
+if _project_root not in sys.path:
+    sys.path.insert(0, _project_root)
+
 page_array = [
     st.Page(page="home.py", title="Home", icon="🏠"),
     st.Page(page="configuration.py", title="Configuration", icon="⚙️"),
@@ -7,6 +16,7 @@ page_array = [
     st.Page(page="simulation.py", title="Simulation", icon="🔬"),
     st.Page(page="gcode.py", title="G-Code", icon="📝"),
 ]
+# Page config is set once here; st.Page supplies each page's title and icon
 st.set_page_config(page_title="MALDI Sample Preparation", page_icon="🔬", layout="wide")
 pg = st.navigation(page_array)
 pg.run()
\ No newline at end of file
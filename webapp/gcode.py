@@ -1,7 +1,22 @@
 import streamlit as st
+from itertools import islice
 from wrapper.MaldiStatus import MaldiStatus
 
-st.set_page_config(page_title="G-Code", page_icon="📝", layout="wide")
+# Lines shown in the preview; the full file is only read for the download
+_PREVIEW_LINES = 500
+
+
+def _show_gcode(file_path: str, file_name: str, key: str) -> None:
+    """Offer the generated file for download and preview its first lines."""
+    with open(file_path, "rb") as f:
+        st.download_button("⬇️ Download G-Code", f, file_name=file_name, key=key, mime="text/plain")
+    with open(file_path, "r") as f:
+        preview = "".join(islice(f, _PREVIEW_LINES))
+        truncated = f.readline() != ""
+    with st.expander("📋 Preview G-Code"):
+        st.code(preview, language="gcode")
+        if truncated:
+            st.caption(f"Showing the first {_PREVIEW_LINES} lines; download the file for the full program.")
 
 st.title("📝 G-Code Generation")
 st.markdown("---")
@@ -35,11 +50,7 @@ if st.button("📝 Generate G-Code", type="primary", use_container_width=True):
             with col_time3:
                 st.metric("🔥 Heating Time", f"{time_estimate['heating_seconds']:.1f}s")
             
-            with open(file_path, "r") as f:
-                gcode_content = f.read()
-            st.download_button("⬇️ Download G-Code", gcode_content, file_name=output_file, mime="text/plain")
-            with st.expander("📋 Preview G-Code"):
-                st.code(gcode_content, language="gcode")
+            _show_gcode(file_path, output_file, key="download")
         except Exception as e:
             st.error(f"❌ Error generating G-Code: {e}")
 
@@ -71,10 +82,6 @@ if st.button("📝 Generate from Specific Stride", use_container_width=True):
             with col_time3:
                 st.metric("🔥 Heating Time", f"{time_estimate['heating_seconds']:.1f}s")
             
-            with open(file_path, "r") as f:
-                gcode_content = f.read()
-            st.download_button("⬇️ Download G-Code", gcode_content, file_name=specific_file, key="download_specific", mime="text/plain")
-            with st.expander("📋 Preview G-Code"):
-                st.code(gcode_content, language="gcode")
+            _show_gcode(file_path, specific_file, key="download_specific")
         except Exception as e:
             st.error(f"❌ Error generating G-Code: {e}")
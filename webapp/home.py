@@ -1,7 +1,5 @@
 import streamlit as st
 
-st.set_page_config(page_title="Home", page_icon="🏠", layout="wide")
-
 st.title("🔬 MALDI Sample Preparation")
 st.markdown("---")
 
@@ -3,8 +3,6 @@ from wrapper.MaldiStatus import MaldiStatus
 from wrapper import SampleConfig
 from wrapper.Config import Config
 
-st.set_page_config(page_title="Samples", page_icon="🧫", layout="wide")
-
 st.title("🧫 Samples")
 st.markdown("---")
 
@@ -45,12 +43,18 @@ st.markdown("---")
 st.header("📋 Current Samples")
 samples_info = ms.get_samples_info()
 if samples_info:
-    for i, info in enumerate(samples_info):
-        with st.expander(f"Sample {i+1}", expanded=True):
-            col_a, col_b = st.columns(2)
-            with col_a:
-                st.metric("Bottom Left Corner", f"({info['bl_corner'][0]:.1f}, {info['bl_corner'][1]:.1f})")
-            with col_b:
-                st.metric("Size (X × Y)", f"{info['x_size']:.1f} × {info['y_size']:.1f} mm")
+    # One table for all samples instead of an expander with metrics per sample
+    st.dataframe(
+        [
+            {
+                "Sample": i + 1,
+                "Bottom Left Corner": f"({info['bl_corner'][0]:.1f}, {info['bl_corner'][1]:.1f})",
+                "Size (X × Y)": f"{info['x_size']:.1f} × {info['y_size']:.1f} mm",
+            }
+            for i, info in enumerate(samples_info)
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
 else:
     st.info("ℹ️ No samples added yet. Add a sample above to get started.")
@@ -1,11 +1,8 @@
 import streamlit as st
 from wrapper.MaldiStatus import MaldiStatus
 import matplotlib.pyplot as plt
-from pathlib import Path
-import sys
 import numpy as np  # For any potential numeric handling
 # Removed scipy.ndimage import; using existing get_std_deviation instead
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 from logging_config import get_logger
 
 # Helper to classify spread quality based only on standard deviation magnitude
@@ -22,8 +19,6 @@ def _classify_spread_std(std_val: float):
 
 logger = get_logger("MALDI.WebApp.Simulation")
 
-st.set_page_config(page_title="Simulation", page_icon="🔬", layout="wide")
-
 st.title("🔬 Simulation")
 st.markdown("---")
 
@@ -1,10 +1,17 @@
 import json
 import os
+from contextlib import contextmanager
 from typing import List
 import shutil
 
 import numpy as np
 
+try:
+    # Optional: faster JSON serialization straight to bytes
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class Config:
     """Singleton configuration manager for MALDI machine and simulation settings."""
@@ -15,6 +22,9 @@ class Config:
     simulation_settings = {}
     _sample_defaults = {}
     bed_mesh = None
+    # defer_save() nesting depth, and whether a deferred set() still needs saving
+    _defer_depth = 0
+    _dirty = False
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
@@ -141,26 +151,47 @@ class Config:
             raise KeyError(f"Config key '{key}' not found.")
 
     def set(self, key: str, value):
-        """Set config value by key and persist to disk."""
-        updated = False
+        """Set config value by key and persist to disk (once on exit inside defer_save())."""
         if key in self.machine_settings:
             self.machine_settings[key] = value
-            updated = True
         elif key in self.simulation_settings:
             self.simulation_settings[key] = value
-            updated = True
         elif key in self._sample_defaults:
             self._sample_defaults[key] = value
-            updated = True
         elif key == "k_sigma":
             self.k_sigma = value
-            updated = True
         else:
             raise KeyError(f"Config key '{key}' not found.")
-        if updated:
+        if self._defer_depth:
+            self._dirty = True
+        else:
             # Auto-save any change
             self.save()
 
+    def update(self, values: dict) -> None:
+        """Set several config values and persist them with a single save.
+        All keys are checked first, so an unknown key leaves the config unchanged.
+        """
+        known = set(self.machine_settings) | set(self.simulation_settings) | set(self._sample_defaults) | {"k_sigma"}
+        unknown = [k for k in values if k not in known]
+        if unknown:
+            raise KeyError(f"Config key '{unknown[0]}' not found.")
+        with self.defer_save():
+            for key, value in values.items():
+                self.set(key, value)
+
+    @contextmanager
+    def defer_save(self):
+        """Batch set() calls: save at most once, when the outermost block exits."""
+        self._defer_depth += 1
+        try:
+            yield self
+        finally:
+            self._defer_depth -= 1
+            if self._defer_depth == 0 and self._dirty:
+                self._dirty = False
+                self.save()
+
     # ========================== Persistence helpers ==========================
     def to_dict(self) -> dict:
         """Serialize current config to a JSON-serializable dict."""
@@ -178,8 +209,15 @@ class Config:
         # Ensure parent directory exists
         os.makedirs(os.path.dirname(cfg_path), exist_ok=True)
         tmp_path = cfg_path + ".tmp"
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            json.dump(self.to_dict(), f, indent=2)
+        if orjson is not None:
+            # NumPy scalars (e.g. from widgets or arrays) are serialized like plain numbers.
+            # Parses to the same values as the json dump, but the text differs: orjson writes
+            # small floats positionally (0.00001, not 1e-05) and non-ASCII as raw UTF-8
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, indent=2)
         # Atomic-ish replace
         if os.path.exists(cfg_path):
             try:
@@ -198,8 +236,12 @@ class Config:
         if not os.path.exists(cfg_path):
             return
         try:
-            with open(cfg_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            if orjson is not None:
+                with open(cfg_path, "rb") as f:
+                    data = orjson.loads(f.read())
+            else:
+                with open(cfg_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
         except Exception:
             # If file is corrupted or unreadable, skip loading
             return
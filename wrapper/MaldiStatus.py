@@ -168,10 +168,10 @@ class MaldiStatus:
                 return_figs=return_figs,
                 progress_callback=progress_callback
             )
-            series = [float(np.mean(devs)) if isinstance(devs, (list, np.ndarray)) else float(devs)
-                      for _, devs in s_aggregator.optimizer.dev_vs_stride]
-            best_idx = int(np.argmin(series))
-            best_stride = float(s_aggregator.optimizer.dev_vs_stride[best_idx][0])
+            # Mean std dev over regions per stride, straight from the record columns
+            sweep = s_aggregator.optimizer.dev_vs_stride
+            best_idx = int(np.argmin(sweep.devs.mean(axis=1)))
+            best_stride = float(sweep.stride[best_idx])
             best_strides.append(best_stride)
             logger.info(f"Sample {idx+1} optimal stride: {best_stride:.3f}mm")
         # Fallback if sample_idx out of range
@@ -276,9 +276,7 @@ class MaldiStatus:
         self.bed_mesh.clear_deposition_mesh()
         
         # Create movements and simulate
-        movements = []
-        for s_agg in self.samples:
-            movements.extend(s_agg.serpentine.movements)
+        movements = np.concatenate([s_agg.serpentine.movements_arr for s_agg in self.samples])
         
         from simulation import Scheduler
         sim = Scheduler(bed=self.bed_mesh, mov_list=movements)
@@ -290,8 +288,7 @@ class MaldiStatus:
             matplotlib.use('Agg')
             import matplotlib.pyplot as plt
             fig, ax = plt.subplots()
-            self.bed_mesh.plot(keyword="deposition", ax=ax)
-            self.bed_mesh.plot(keyword="boxes", ax=ax)
+            self.bed_mesh.plot_combined(ax=ax)
             for s_agg in self.samples:
                 s_agg.serpentine.draw(ax=ax)
             ax.set_title(f"Deposition Map - Stride: {stride:.3f} mm")
@@ -328,9 +325,7 @@ class MaldiStatus:
         
         # Clear deposition mesh and simulate
         self.bed_mesh.clear_deposition_mesh()
-        movements = []
-        for s_agg in self.samples:
-            movements.extend(list(s_agg.serpentine.movements))
+        movements = np.concatenate([s_agg.serpentine.movements_arr for s_agg in self.samples])
         
         from simulation import Scheduler
         sim = Scheduler(bed=self.bed_mesh, mov_list=movements)
@@ -339,11 +334,8 @@ class MaldiStatus:
         # Create visualization
         fig, ax = plt.subplots(figsize=(10, 8))
         
-        # Plot deposition mesh
-        self.bed_mesh.plot(keyword="deposition", ax=ax)
-        
-        # Plot sample boxes with best stride annotations
-        self.bed_mesh.plot(keyword="boxes", ax=ax)
+        # Plot deposition mesh and sample boxes
+        self.bed_mesh.plot_combined(ax=ax)
         
         # Draw serpentines and annotate with stride values
         for i, (s_agg, stride) in enumerate(zip(self.samples, best_strides)):